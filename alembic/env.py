@@ -14,8 +14,8 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 from apps.api.app.config import get_settings  # noqa: E402
-from apps.api.app.database import Base  # noqa: E402
-from apps.api.app import models  # noqa: F401,E402
+# Importing Base through models registers every mapped table on Base.metadata in one step.
+from apps.api.app.models import Base  # noqa: E402
 
 config = context.config
 
@@ -0,0 +1,63 @@
+"""Ensure unique keys used by upserts
+
+Revision ID: 0003_workspace_unique_keys
+Revises: 0002_add_inventory_vendor
+Create Date: 2026-10-15 00:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0003_workspace_unique_keys"
+down_revision: Union[str, Sequence[str], None] = "0002_add_inventory_vendor"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_DUPLICATE_WORKSPACE_NAMES_SQL = sa.text(
+    "SELECT name FROM workspaces GROUP BY name HAVING COUNT(*) > 1 ORDER BY name"
+)
+_DUPLICATE_MEMBERSHIPS_SQL = sa.text(
+    """
+    SELECT workspace_id, user_id
+    FROM workspace_members
+    GROUP BY workspace_id, user_id
+    HAVING COUNT(*) > 1
+    ORDER BY workspace_id, user_id
+    """
+)
+
+
+def _ensure_no_duplicates() -> None:
+    # Fail with the offending keys rather than a bare IntegrityError from the index build.
+    bind = op.get_bind()
+    problems: list[str] = []
+
+    duplicate_names = bind.execute(_DUPLICATE_WORKSPACE_NAMES_SQL).scalars().all()
+    if duplicate_names:
+        problems.append(f"duplicate workspace names: {', '.join(repr(name) for name in duplicate_names)}")
+
+    duplicate_memberships = bind.execute(_DUPLICATE_MEMBERSHIPS_SQL).all()
+    if duplicate_memberships:
+        pairs = ", ".join(f"(workspace_id={row.workspace_id}, user_id={row.user_id})" for row in duplicate_memberships)
+        problems.append(f"duplicate workspace memberships: {pairs}")
+
+    if problems:
+        raise RuntimeError(
+            "Cannot add workspace unique keys; merge or delete the duplicates first. " + "; ".join(problems)
+        )
+
+
+def upgrade() -> None:
+    _ensure_no_duplicates()
+    op.create_index("ix_workspaces_name", "workspaces", ["name"], unique=True)
+    with op.batch_alter_table("workspace_members") as batch_op:
+        batch_op.create_unique_constraint("uq_workspace_members_workspace_user", ["workspace_id", "user_id"])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("workspace_members") as batch_op:
+        batch_op.drop_constraint("uq_workspace_members_workspace_user", type_="unique")
+    op.drop_index("ix_workspaces_name", table_name="workspaces")
@@ -0,0 +1,60 @@
+"""Store enum columns as native Postgres enums
+
+Revision ID: 0004_native_enum_columns
+Revises: 0003_workspace_unique_keys
+Create Date: 2026-10-15 00:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "0004_native_enum_columns"
+down_revision: Union[str, Sequence[str], None] = "0003_workspace_unique_keys"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (type name, values, (table, column) pairs using it)
+_ENUM_COLUMNS = (
+    ("role", ("admin", "member"), (("workspace_members", "role"),)),
+    (
+        "inventorystatus",
+        ("in_stock", "low_stock", "ordered", "discontinued"),
+        (("inventory_items", "status"),),
+    ),
+    (
+        "eventattendance",
+        ("upcoming", "attending", "maybe", "declined"),
+        (("events", "status"), ("event_invites", "status")),
+    ),
+)
+
+
+def upgrade() -> None:
+    # SQLite has no enum type; the VARCHAR columns from 0001 stay as they are there.
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    for type_name, values, columns in _ENUM_COLUMNS:
+        postgresql.ENUM(*values, name=type_name).create(bind, checkfirst=True)
+        for table, column in columns:
+            op.execute(
+                f'ALTER TABLE {table} ALTER COLUMN "{column}" TYPE "{type_name}" USING "{column}"::"{type_name}"'
+            )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    for type_name, values, columns in _ENUM_COLUMNS:
+        length = max(len(value) for value in values)
+        for table, column in columns:
+            op.execute(
+                f'ALTER TABLE {table} ALTER COLUMN "{column}" TYPE VARCHAR({length}) USING "{column}"::text'
+            )
+        postgresql.ENUM(*values, name=type_name).drop(bind, checkfirst=True)
@@ -0,0 +1,32 @@
+"""Composite user/workspace index for membership lookups
+
+Revision ID: 0005_workspace_member_user_index
+Revises: 0004_native_enum_columns
+Create Date: 2026-10-15 00:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0005_workspace_member_user_index"
+down_revision: Union[str, Sequence[str], None] = "0004_native_enum_columns"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_workspace_members_user_workspace",
+        "workspace_members",
+        ["user_id", "workspace_id"],
+        unique=False,
+    )
+    # Subsumed by the composite index above (user_id is its leading column).
+    op.drop_index("ix_workspace_members_user_id", table_name="workspace_members")
+
+
+def downgrade() -> None:
+    op.create_index("ix_workspace_members_user_id", "workspace_members", ["user_id"], unique=False)
+    op.drop_index("ix_workspace_members_user_workspace", table_name="workspace_members")
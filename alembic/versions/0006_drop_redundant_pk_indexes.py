@@ -0,0 +1,36 @@
+"""Drop single-column indexes duplicating primary keys
+
+Revision ID: 0006_drop_redundant_pk_indexes
+Revises: 0005_workspace_member_user_index
+Create Date: 2026-10-15 00:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0006_drop_redundant_pk_indexes"
+down_revision: Union[str, Sequence[str], None] = "0005_workspace_member_user_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Each primary key already has its own unique index, so these only add write cost.
+_PK_INDEXES = (
+    ("ix_users_id", "users"),
+    ("ix_workspaces_id", "workspaces"),
+    ("ix_inventory_items_id", "inventory_items"),
+    ("ix_events_id", "events"),
+    ("ix_event_invites_id", "event_invites"),
+    ("ix_ai_runs_id", "ai_runs"),
+)
+
+
+def upgrade() -> None:
+    for index_name, table_name in _PK_INDEXES:
+        op.drop_index(index_name, table_name=table_name)
+
+
+def downgrade() -> None:
+    for index_name, table_name in reversed(_PK_INDEXES):
+        op.create_index(index_name, table_name, ["id"], unique=False)
@@ -0,0 +1,42 @@
+"""Trigram indexes for event title and location search
+
+Revision ID: 0007_event_search_trgm_indexes
+Revises: 0006_drop_redundant_pk_indexes
+Create Date: 2026-10-15 00:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0007_event_search_trgm_indexes"
+down_revision: Union[str, Sequence[str], None] = "0006_drop_redundant_pk_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# gin_trgm_ops indexes serve ILIKE '%term%' directly, so the raw columns are indexed rather than lower().
+_TRGM_INDEXES = (
+    ("ix_events_title_trgm", "title"),
+    ("ix_events_location_trgm", "location"),
+)
+
+
+def upgrade() -> None:
+    # pg_trgm is Postgres-only; SQLite keeps scanning, which is fine at its scale.
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for index_name, column in _TRGM_INDEXES:
+        op.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON events USING gin ({column} gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    for index_name, _column in reversed(_TRGM_INDEXES):
+        op.execute(f"DROP INDEX IF EXISTS {index_name}")
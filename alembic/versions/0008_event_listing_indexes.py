@@ -0,0 +1,42 @@
+"""Composite indexes matching event and invite listing order
+
+Revision ID: 0008_event_listing_indexes
+Revises: 0007_event_search_trgm_indexes
+Create Date: 2026-10-15 00:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0008_event_listing_indexes"
+down_revision: Union[str, Sequence[str], None] = "0007_event_search_trgm_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (new composite index, table, columns, single-column index it subsumes, that index's column)
+_COMPOSITE_INDEXES = (
+    ("ix_events_workspace_start", "events", ["workspace_id", "start_at"], "ix_events_workspace_id", "workspace_id"),
+    (
+        "ix_event_invites_event_invited",
+        "event_invites",
+        ["event_id", "invited_at"],
+        "ix_event_invites_event_id",
+        "event_id",
+    ),
+)
+
+
+def upgrade() -> None:
+    # list_events orders by start_at within a workspace and list_event_invites by invited_at DESC
+    # within an event; btrees scan backwards, so both orders come straight off these indexes.
+    for index_name, table_name, columns, old_index, _old_column in _COMPOSITE_INDEXES:
+        op.create_index(index_name, table_name, columns, unique=False)
+        op.drop_index(old_index, table_name=table_name)
+
+
+def downgrade() -> None:
+    for index_name, table_name, _columns, old_index, old_column in reversed(_COMPOSITE_INDEXES):
+        op.create_index(old_index, table_name, [old_column], unique=False)
+        op.drop_index(index_name, table_name=table_name)
@@ -0,0 +1,40 @@
+"""GiST index for workspace event overlap checks
+
+Revision ID: 0009_event_time_range_index
+Revises: 0008_event_listing_indexes
+Create Date: 2026-10-15 00:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0009_event_time_range_index"
+down_revision: Union[str, Sequence[str], None] = "0008_event_listing_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Postgres-only: SQLite keeps answering overlap checks from the start_at/end_at btrees.
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    # btree_gist lets the integer workspace_id share a GiST index with the range expression.
+    # start_at/end_at are timestamp without time zone, so the expression is tsrange (tstzrange
+    # would depend on the session time zone and is not allowed in an index).
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_events_workspace_time_range "
+        "ON events USING gist (workspace_id, tsrange(start_at, end_at))"
+    )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    op.execute("DROP INDEX IF EXISTS ix_events_workspace_time_range")
@@ -0,0 +1,34 @@
+"""Cascade event deletes to their invites
+
+Revision ID: 0010_event_invites_cascade
+Revises: 0009_event_time_range_index
+Create Date: 2026-10-15 00:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0010_event_invites_cascade"
+down_revision: Union[str, Sequence[str], None] = "0009_event_time_range_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# 0001 left the constraint unnamed; this matches Postgres' default name so SQLite batch mode can find it too.
+_NAMING_CONVENTION = {"fk": "%(table_name)s_%(column_0_name)s_fkey"}
+_FK_NAME = "event_invites_event_id_fkey"
+
+
+def _recreate_event_fk(ondelete: str | None) -> None:
+    with op.batch_alter_table("event_invites", naming_convention=_NAMING_CONVENTION) as batch_op:
+        batch_op.drop_constraint(_FK_NAME, type_="foreignkey")
+        batch_op.create_foreign_key(_FK_NAME, "events", ["event_id"], ["id"], ondelete=ondelete)
+
+
+def upgrade() -> None:
+    _recreate_event_fk("CASCADE")
+
+
+def downgrade() -> None:
+    _recreate_event_fk(None)
@@ -0,0 +1,34 @@
+"""Index inventory names by length for duplicate lookups
+
+Revision ID: 0011_inventory_name_length_index
+Revises: 0010_event_invites_cascade
+Create Date: 2026-10-15 00:00:00
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0011_inventory_name_length_index"
+down_revision: Union[str, Sequence[str], None] = "0010_event_invites_cascade"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Serves the length band _find_duplicate_candidates filters on before fuzzy scoring.
+    op.create_index(
+        "ix_inventory_items_workspace_name_length",
+        "inventory_items",
+        ["workspace_id", sa.text("length(normalized_name)")],
+        unique=False,
+    )
+    # Subsumed by the composite index above (workspace_id is its leading column).
+    op.drop_index("ix_inventory_items_workspace_id", table_name="inventory_items")
+
+
+def downgrade() -> None:
+    op.create_index("ix_inventory_items_workspace_id", "inventory_items", ["workspace_id"], unique=False)
+    op.drop_index("ix_inventory_items_workspace_name_length", table_name="inventory_items")
@@ -0,0 +1,33 @@
+"""Composite workspace/name index for exact inventory lookups
+
+Revision ID: 0012_inventory_workspace_name_index
+Revises: 0011_inventory_name_length_index
+Create Date: 2026-10-15 00:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0012_inventory_workspace_name_index"
+down_revision: Union[str, Sequence[str], None] = "0011_inventory_name_length_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Not unique: the import's create_new action deliberately keeps same-named items side by side.
+    op.create_index(
+        "ix_inventory_items_workspace_normalized_name",
+        "inventory_items",
+        ["workspace_id", "normalized_name"],
+        unique=False,
+    )
+    # Every normalized_name lookup is scoped to a workspace, so the composite index replaces this one.
+    op.drop_index("ix_inventory_items_normalized_name", table_name="inventory_items")
+
+
+def downgrade() -> None:
+    op.create_index("ix_inventory_items_normalized_name", "inventory_items", ["normalized_name"], unique=False)
+    op.drop_index("ix_inventory_items_workspace_normalized_name", table_name="inventory_items")
@@ -0,0 +1,44 @@
+"""Trigram indexes for inventory item search
+
+Revision ID: 0013_inventory_search_trgm_indexes
+Revises: 0012_inventory_workspace_name_index
+Create Date: 2026-10-15 00:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0013_inventory_search_trgm_indexes"
+down_revision: Union[str, Sequence[str], None] = "0012_inventory_workspace_name_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# list_items matches ILIKE '%term%' against each of these columns; gin_trgm_ops serves that directly.
+_TRGM_INDEXES = (
+    ("ix_inventory_items_name_trgm", "name"),
+    ("ix_inventory_items_vendor_trgm", "vendor"),
+    ("ix_inventory_items_category_trgm", "category"),
+    ("ix_inventory_items_unit_trgm", "unit"),
+)
+
+
+def upgrade() -> None:
+    # pg_trgm is Postgres-only; SQLite keeps scanning, which is fine at its scale.
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for index_name, column in _TRGM_INDEXES:
+        op.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON inventory_items USING gin ({column} gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    for index_name, _column in reversed(_TRGM_INDEXES):
+        op.execute(f"DROP INDEX IF EXISTS {index_name}")
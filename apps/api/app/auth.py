@@ -1,33 +1,62 @@
+import os
+import threading
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import TYPE_CHECKING
 
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+import jwt
 
 from .config import get_settings
 
-# Use pbkdf2_sha256 to avoid bcrypt backend/version issues and the 72-byte limit.
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
 settings = get_settings()
 
+# Caps concurrent pbkdf2 verifications so a login storm cannot occupy every worker thread at once.
+_VERIFY_SLOTS = threading.BoundedSemaphore(os.cpu_count() or 4)
+
+# Signing inputs are fixed for the process lifetime; resolve them once instead of per token.
+_JWT_KEY = settings.jwt_secret
+_JWT_ALGORITHM = settings.jwt_algorithm
+_JWT_ALGORITHMS = [_JWT_ALGORITHM]
+
+
+@lru_cache(maxsize=1)
+def get_pwd_context() -> "CryptContext":
+    # passlib is only needed by register/login, so keep it off the cold-start import path.
+    from passlib.context import CryptContext
+
+    # Use pbkdf2_sha256 to avoid bcrypt backend/version issues and the 72-byte limit.
+    # passlib computes it through hashlib.pbkdf2_hmac (OpenSSL), so the KDF already runs in native code.
+    return CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+
 
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    with _VERIFY_SLOTS:
+        return get_pwd_context().verify(plain_password, hashed_password)
+
+
+@lru_cache(maxsize=1)
+def dummy_password_hash() -> str:
+    # Verified against when the email is unknown, so both login failure paths cost one pbkdf2 run.
+    return hash_password(os.urandom(16).hex())
 
 
 def create_access_token(subject: str) -> str:
     expire = datetime.now(timezone.utc) + timedelta(minutes=settings.access_token_expire_minutes)
     to_encode = {"sub": subject, "exp": expire}
-    return jwt.encode(to_encode, settings.jwt_secret, algorithm=settings.jwt_algorithm)
+    return jwt.encode(to_encode, _JWT_KEY, algorithm=_JWT_ALGORITHM)
 
 
 def decode_access_token(token: str) -> str:
     try:
-        payload = jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
-    except JWTError as exc:  # pragma: no cover
+        payload = jwt.decode(token, _JWT_KEY, algorithms=_JWT_ALGORITHMS)
+    except jwt.PyJWTError as exc:  # pragma: no cover
         raise ValueError("Invalid token") from exc
 
     subject = payload.get("sub")
@@ -1,16 +1,56 @@
+import os
+from dataclasses import dataclass, field, fields
 from functools import lru_cache
-from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
-
-from pydantic_settings import BaseSettings, SettingsConfigDict
+from pathlib import Path
 
 from .secret_vault import SecretVaultError, read_secret
 
-
-class Settings(BaseSettings):
-    model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
-
+ENV_FILE = ".env"
+_TRUE_VALUES = {"1", "true", "yes", "on"}
+_FALSE_VALUES = {"0", "false", "no", "off", ""}
+
+
+def _read_env_file(path: str) -> dict[str, str]:
+    env_path = Path(path)
+    if not env_path.is_file():
+        return {}
+
+    values: dict[str, str] = {}
+    for line in env_path.read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if not line or line.startswith("#") or "=" not in line:
+            continue
+        key, value = line.split("=", 1)
+        key = key.strip()
+        if key.startswith("export "):
+            key = key[len("export ") :].strip()
+        value = value.strip()
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in {"'", '"'}:
+            value = value[1:-1]
+        values[key.lower()] = value
+    return values
+
+
+def _parse_bool(name: str, raw: str) -> bool:
+    lowered = raw.strip().lower()
+    if lowered in _TRUE_VALUES:
+        return True
+    if lowered in _FALSE_VALUES:
+        return False
+    raise ValueError(f"Invalid boolean value for {name.upper()}: {raw!r}")
+
+
+@dataclass(frozen=True, slots=True)
+class Settings:
     app_env: str = "development"
     database_url: str = "sqlite:///./app.db"
+    # Disable when connecting through a transaction-mode pooler (e.g. Supabase on port 6543).
+    database_prepared_statements: bool = True
+    database_pool_size: int = 10
+    database_max_overflow: int = 20
+    database_pool_timeout: int = 30
+    # Let an external pooler (PgBouncer, Supavisor) own pooling: open a connection per checkout instead.
+    database_external_pool: bool = False
     jwt_secret: str = "change-me"
     jwt_algorithm: str = "HS256"
     access_token_expire_minutes: int = 1440
@@ -18,12 +58,38 @@ class Settings(BaseSettings):
     ai_provider: str = "mock"
     ai_api_key: str = ""
     ai_model: str = "gpt-4o-mini"
+    import_max_upload_bytes: int = 5 * 1024 * 1024
     cors_origins: str = "http://localhost:3000,http://127.0.0.1:3000,http://localhost:8501,http://127.0.0.1:8501"
     default_workspace_name: str = "OpsPilot Team"
     vault_enabled: bool = False
     vault_path: str = ".vault/secrets.enc"
     vault_master_key: str = ""
 
+    _cors_origins: tuple[str, ...] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        origins = tuple(origin.strip() for origin in self.cors_origins.split(",") if origin.strip())
+        object.__setattr__(self, "_cors_origins", origins)
+
+    @classmethod
+    def from_env(cls, env_file: str | None = ENV_FILE) -> "Settings":
+        # Process environment wins over the .env file; names are matched case-insensitively.
+        sources = _read_env_file(env_file) if env_file else {}
+        sources.update((key.lower(), value) for key, value in os.environ.items())
+
+        values: dict[str, object] = {}
+        for setting in fields(cls):
+            raw = sources.get(setting.name)
+            if not setting.init or raw is None:
+                continue
+            if setting.type is bool:
+                values[setting.name] = _parse_bool(setting.name, raw)
+            elif setting.type is int:
+                values[setting.name] = int(raw.strip())
+            else:
+                values[setting.name] = raw
+        return cls(**values)
+
     @staticmethod
     def normalize_database_url(url: str) -> str:
         url = url.strip()
@@ -38,18 +104,23 @@ class Settings(BaseSettings):
             url = f"postgresql+psycopg://{url[len('postgresql://'):]}"
 
         if url.startswith("postgresql+psycopg://"):
-            parsed = urlsplit(url)
-            query = dict(parse_qsl(parsed.query, keep_blank_values=True))
-            query.setdefault("sslmode", "require")
-            url = urlunsplit((parsed.scheme, parsed.netloc, parsed.path, urlencode(query), parsed.fragment))
+            # Only sslmode is ever injected, so append it in place rather than re-encoding the query string.
+            query_start = url.find("?")
+            if query_start == -1:
+                url = f"{url}?sslmode=require"
+            else:
+                params = url[query_start + 1 :].split("&")
+                if not any(param == "sslmode" or param.startswith("sslmode=") for param in params):
+                    separator = "&" if params[-1] else ""
+                    url = f"{url}{separator}sslmode=require"
 
         return url
 
     def normalized_database_url(self) -> str:
         return self.normalize_database_url(self.database_url)
 
-    def parsed_cors_origins(self) -> list[str]:
-        return [origin.strip() for origin in self.cors_origins.split(",") if origin.strip()]
+    def parsed_cors_origins(self) -> tuple[str, ...]:
+        return self._cors_origins
 
     def get_secret(self, key: str) -> str:
         if key == "AI_API_KEY" and self.ai_api_key:
@@ -70,4 +141,4 @@ class Settings(BaseSettings):
 
 @lru_cache
 def get_settings() -> Settings:
-    return Settings()
+    return Settings.from_env()
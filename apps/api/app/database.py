@@ -1,18 +1,57 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import DeclarativeBase, sessionmaker
+from sqlalchemy.pool import NullPool, StaticPool
 
 from .config import get_settings
 
 settings = get_settings()
 database_url = settings.normalized_database_url()
 
-connect_args = {}
+connect_args: dict = {}
+engine_options: dict = {}
 if database_url.startswith("sqlite"):
     connect_args = {"check_same_thread": False}
+    if database_url in {"sqlite://", "sqlite:///:memory:"}:
+        # An in-memory database only exists on its connection, so every session must share it.
+        engine_options["poolclass"] = StaticPool
+else:
+    if settings.database_external_pool:
+        engine_options["poolclass"] = NullPool
+    else:
+        # Long-lived workers: validate pooled connections (Postgres/Supabase drops idle ones) and recycle them.
+        engine_options.update(
+            pool_pre_ping=True,
+            pool_size=settings.database_pool_size,
+            max_overflow=settings.database_max_overflow,
+            pool_timeout=settings.database_pool_timeout,
+            pool_recycle=1800,
+        )
+    if database_url.startswith("postgresql+psycopg"):
+        # The ORM emits a small, fixed set of statement shapes (e.g. the per-request users lookup), so
+        # prepare them on first use. Transaction-mode poolers cannot keep prepared statements.
+        connect_args = {"prepare_threshold": 0 if settings.database_prepared_statements else None}
 
-engine = create_engine(database_url, connect_args=connect_args)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
+engine = create_engine(database_url, connect_args=connect_args, **engine_options)
+
+if database_url.startswith("sqlite"):
+    # SQLite ignores foreign keys (and so ON DELETE CASCADE) unless each connection opts in.
+    @event.listens_for(engine, "connect")
+    def _enable_sqlite_foreign_keys(dbapi_connection, _connection_record) -> None:
+        dbapi_connection.execute("PRAGMA foreign_keys=ON")
+# Keep committed state loaded: handlers serialise what they just wrote, and expiring it would cost a
+# SELECT per object on first access. Defaults are client-side and ids come back from the INSERT.
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+def contains_pattern(term: str) -> str:
+    # Search terms are literal text: escape LIKE wildcards so "50%" or "q_1" match themselves.
+    # Pair with escape="\\" on the like()/ilike() call.
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
 
 
 def init_db() -> None:
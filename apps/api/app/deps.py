@@ -1,6 +1,10 @@
+import hashlib
+import threading
+import time
+
 from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, make_transient_to_detached
 
 from .auth import decode_access_token
 from .database import SessionLocal
@@ -8,6 +12,20 @@ from .models import Role, User, WorkspaceMember
 
 security = HTTPBearer(auto_error=False)
 
+# Token -> detached User snapshot, so repeat requests with the same token skip the users SELECT.
+USER_CACHE_TTL_SECONDS = 30.0
+USER_CACHE_MAX_ENTRIES = 1024
+_user_cache: dict[bytes, tuple[float, User]] = {}
+# Sync dependencies run in the threadpool; evictions and scans must not interleave with inserts.
+_user_cache_lock = threading.Lock()
+
+# (user_id, workspace_id) -> role for require_membership. Only hits are cached, so a newly added member is
+# never refused because of a stale entry; role changes and removals must call invalidate_membership_cache.
+MEMBERSHIP_CACHE_TTL_SECONDS = 60.0
+MEMBERSHIP_CACHE_MAX_ENTRIES = 10_000
+_membership_cache: dict[tuple[int, int], tuple[float, Role]] = {}
+_membership_cache_lock = threading.Lock()
+
 
 def get_db():
     db = SessionLocal()
@@ -30,28 +48,92 @@ def get_current_user(
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(exc)) from exc
 
+    cache_key = hashlib.blake2s(token.encode("utf-8"), digest_size=16).digest()
+    now = time.monotonic()
+    cached = _user_cache.get(cache_key)
+    if cached and now - cached[0] < USER_CACHE_TTL_SECONDS:
+        return db.merge(cached[1], load=False)
+
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+
+    snapshot = _detached_user_snapshot(user)
+    with _user_cache_lock:
+        if len(_user_cache) >= USER_CACHE_MAX_ENTRIES:
+            _user_cache.pop(next(iter(_user_cache)))
+        _user_cache[cache_key] = (now, snapshot)
     return user
 
 
+def _detached_user_snapshot(user: User) -> User:
+    snapshot = User(
+        id=user.id,
+        email=user.email,
+        name=user.name,
+        password_hash=user.password_hash,
+        created_at=user.created_at,
+    )
+    make_transient_to_detached(snapshot)
+    return snapshot
+
+
+def invalidate_user_cache(user_id: int | None = None) -> None:
+    with _user_cache_lock:
+        if user_id is None:
+            _user_cache.clear()
+            return
+        for key, (_, user) in list(_user_cache.items()):
+            if user.id == user_id:
+                _user_cache.pop(key, None)
+
+
 def require_membership(
     db: Session,
-    user_id: int,
+    user: User,
     workspace_id: int,
     admin_only: bool = False,
 ) -> WorkspaceMember:
-    member = (
-        db.query(WorkspaceMember)
-        .filter(WorkspaceMember.workspace_id == workspace_id, WorkspaceMember.user_id == user_id)
-        .first()
-    )
-    if not member:
+    # Roles come from the database, cached briefly, so a removed or demoted member loses access within the TTL.
+    role = _cached_membership_role(db, user.id, workspace_id)
+    if role is None:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not a workspace member")
-    if admin_only and member.role != Role.admin:
+    if admin_only and role != Role.admin:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin role required")
-    return member
+    return WorkspaceMember(workspace_id=workspace_id, user_id=user.id, role=role)
+
+
+def _cached_membership_role(db: Session, user_id: int, workspace_id: int) -> Role | None:
+    cache_key = (user_id, workspace_id)
+    now = time.monotonic()
+    cached = _membership_cache.get(cache_key)
+    if cached and now - cached[0] < MEMBERSHIP_CACHE_TTL_SECONDS:
+        return cached[1]
+
+    role = (
+        db.query(WorkspaceMember.role)
+        .filter(WorkspaceMember.workspace_id == workspace_id, WorkspaceMember.user_id == user_id)
+        .scalar()
+    )
+    with _membership_cache_lock:
+        if role is None:
+            _membership_cache.pop(cache_key, None)
+            return None
+
+        if len(_membership_cache) >= MEMBERSHIP_CACHE_MAX_ENTRIES:
+            _membership_cache.pop(next(iter(_membership_cache)))
+        _membership_cache[cache_key] = (now, role)
+    return role
+
+
+def invalidate_membership_cache(user_id: int | None = None, workspace_id: int | None = None) -> None:
+    with _membership_cache_lock:
+        if user_id is None and workspace_id is None:
+            _membership_cache.clear()
+            return
+        for key in list(_membership_cache):
+            if (user_id is None or key[0] == user_id) and (workspace_id is None or key[1] == workspace_id):
+                _membership_cache.pop(key, None)
 
 
 def get_workspace_id(x_workspace_id: int | None = Header(default=None, alias="X-Workspace-Id")) -> int:
@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select, text
 from sqlalchemy.orm import Session
 
-from ..auth import create_access_token, hash_password, verify_password
+from ..auth import create_access_token, dummy_password_hash, hash_password, verify_password
 from ..config import get_settings
 from ..deps import get_current_user, get_db
 from ..models import Role, User, Workspace, WorkspaceMember
@@ -10,9 +11,48 @@ from ..schemas import LoginRequest, MeResponse, MembershipOut, RegisterRequest,
 router = APIRouter(prefix="/auth", tags=["auth"])
 settings = get_settings()
 
+# Postgres: create the user, ensure the default workspace, and link the membership in one round-trip.
+# An existing email makes `u` empty, so nothing is linked and no row is returned.
+_REGISTER_MEMBER_SQL = text(
+    """
+    WITH u AS (
+        INSERT INTO users (email, name, password_hash)
+        VALUES (:email, :name, :password_hash)
+        ON CONFLICT (email) DO NOTHING
+        RETURNING id
+    ),
+    w AS (
+        INSERT INTO workspaces (name)
+        VALUES (:workspace_name)
+        ON CONFLICT (name) DO UPDATE SET name = EXCLUDED.name
+        RETURNING id
+    )
+    INSERT INTO workspace_members (workspace_id, user_id, role)
+    SELECT w.id, u.id, CAST(:role AS role) FROM u, w
+    RETURNING user_id
+    """
+)
+
 
 @router.post("/register", response_model=TokenResponse)
 def register(payload: RegisterRequest, db: Session = Depends(get_db)) -> TokenResponse:
+    if db.get_bind().dialect.name == "postgresql":
+        user_id = db.execute(
+            _REGISTER_MEMBER_SQL,
+            {
+                "email": payload.email,
+                "name": payload.name,
+                "password_hash": hash_password(payload.password),
+                "workspace_name": settings.default_workspace_name,
+                "role": Role.member.value,
+            },
+        ).scalar()
+        if user_id is None:
+            db.rollback()
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Email already registered")
+        db.commit()
+        return TokenResponse(access_token=create_access_token(str(user_id)))
+
     existing = db.query(User).filter(User.email == payload.email).first()
     if existing:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Email already registered")
@@ -38,7 +78,8 @@ def register(payload: RegisterRequest, db: Session = Depends(get_db)) -> TokenRe
 def login(payload: LoginRequest, db: Session = Depends(get_db)) -> TokenResponse:
     email = payload.email.strip().lower()
     user = db.query(User).filter(User.email == email).first()
-    if not user or not verify_password(payload.password, user.password_hash):
+    password_ok = verify_password(payload.password, user.password_hash if user else dummy_password_hash())
+    if not user or not password_ok:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
     token = create_access_token(str(user.id))
     return TokenResponse(access_token=token)
@@ -46,15 +87,15 @@ def login(payload: LoginRequest, db: Session = Depends(get_db)) -> TokenResponse
 
 @router.get("/me", response_model=MeResponse)
 def me(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)) -> MeResponse:
-    memberships = (
-        db.query(WorkspaceMember, Workspace)
+    # Column tuples only: no ORM identity-map bookkeeping for rows that are serialized straight away.
+    rows = db.execute(
+        select(WorkspaceMember.workspace_id, Workspace.name, WorkspaceMember.role)
         .join(Workspace, Workspace.id == WorkspaceMember.workspace_id)
-        .filter(WorkspaceMember.user_id == current_user.id)
-        .all()
-    )
+        .where(WorkspaceMember.user_id == current_user.id)
+    ).all()
 
     items = [
-        MembershipOut(workspace_id=membership.workspace_id, workspace_name=workspace.name, role=membership.role)
-        for membership, workspace in memberships
+        MembershipOut(workspace_id=workspace_id, workspace_name=workspace_name, role=role)
+        for workspace_id, workspace_name, role in rows
     ]
     return MeResponse(id=current_user.id, email=current_user.email, name=current_user.name, workspaces=items)
@@ -1,11 +1,13 @@
 from datetime import datetime
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import and_, func, or_
-from sqlalchemy.orm import Session
+from sqlalchemy import DateTime, and_, cast, func, insert, or_
+from sqlalchemy.orm import Session, raiseload
 
+from ..config import get_settings
+from ..database import contains_pattern
 from ..deps import get_current_user, get_db, get_workspace_id, require_membership
-from ..models import Event, EventInvite, User
+from ..models import Event, EventInvite, User, WorkspaceMember
 from ..schemas import (
     EventDescriptionRequest,
     EventDescriptionResponse,
@@ -20,42 +22,71 @@ from ..schemas import (
     InviteMessageResponse,
     NLCreateRequest,
     SuggestAlternativesRequest,
+    SuggestAlternativesResponse,
 )
 from ..services.ai_service import ai_service
 
 router = APIRouter(prefix="/events", tags=["events"])
+settings = get_settings()
+
+# Outside production, touching a relationship on listed rows raises instead of quietly issuing a SELECT per row.
+_LIST_LOAD_OPTIONS = () if settings.app_env == "production" else (raiseload("*"),)
+
+# Exactly the EventOut fields; list_events selects these as plain rows instead of hydrating Event instances.
+_EVENT_OUT_COLUMNS = (
+    Event.id,
+    Event.workspace_id,
+    Event.title,
+    Event.start_at,
+    Event.end_at,
+    Event.location,
+    Event.description,
+    Event.status,
+    Event.invite_message,
+)
+
+
+def _insert_invites(db: Session, event_id: int, emails: list[str]) -> None:
+    if not emails:
+        return
+    users = db.query(User.id, User.email).filter(User.email.in_(emails)).all()
+    user_id_by_email = {email: user_id for user_id, email in users}
+    # Core executemany: one batched INSERT without per-object unit-of-work bookkeeping.
+    db.execute(
+        insert(EventInvite),
+        [
+            {"event_id": event_id, "invited_user_email": email, "invited_user_id": user_id_by_email.get(email)}
+            for email in emails
+        ],
+    )
 
 
 @router.get("", response_model=list[EventOut])
 def list_events(
     query: str | None = Query(default=None),
-    date_from: str | None = Query(default=None, alias="from"),
-    date_to: str | None = Query(default=None, alias="to"),
+    date_from: datetime | None = Query(default=None, alias="from"),
+    date_to: datetime | None = Query(default=None, alias="to"),
     location: str | None = Query(default=None),
     workspace_id: int = Depends(get_workspace_id),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> list[EventOut]:
-    require_membership(db, current_user.id, workspace_id)
-
-    q = db.query(Event).filter(Event.workspace_id == workspace_id)
+    require_membership(db, current_user, workspace_id)
+
+    q = db.query(*_EVENT_OUT_COLUMNS).filter(Event.workspace_id == workspace_id)
+    if date_from is not None:
+        q = q.filter(Event.start_at >= date_from)
+    if date_to is not None:
+        q = q.filter(Event.start_at <= date_to)
+
+    # Blank search terms would become ILIKE '%%', which matches everything but still costs a pattern scan.
+    query = (query or "").strip()
+    location = (location or "").strip()
+    # ILIKE on the bare columns lets Postgres use the pg_trgm indexes (ix_events_*_trgm).
     if query:
-        like = f"%{query.lower()}%"
-        q = q.filter(func.lower(Event.title).like(like))
+        q = q.filter(Event.title.ilike(contains_pattern(query), escape="\\"))
     if location:
-        q = q.filter(func.lower(Event.location).like(f"%{location.lower()}%"))
-    if date_from:
-        try:
-            parsed_from = datetime.fromisoformat(date_from)
-        except ValueError as exc:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid 'from' datetime") from exc
-        q = q.filter(Event.start_at >= parsed_from)
-    if date_to:
-        try:
-            parsed_to = datetime.fromisoformat(date_to)
-        except ValueError as exc:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid 'to' datetime") from exc
-        q = q.filter(Event.start_at <= parsed_to)
+        q = q.filter(Event.location.ilike(contains_pattern(location), escape="\\"))
 
     return q.order_by(Event.start_at.asc()).all()
 
@@ -67,10 +98,7 @@ def create_event(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> EventOut:
-    require_membership(db, current_user.id, workspace_id)
-
-    if payload.end_at <= payload.start_at:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="end_at must be after start_at")
+    require_membership(db, current_user, workspace_id)
 
     event = Event(
         workspace_id=workspace_id,
@@ -85,18 +113,9 @@ def create_event(
     db.add(event)
     db.flush()
 
-    for email in payload.invitees:
-        invited_user = db.query(User).filter(User.email == str(email)).first()
-        db.add(
-            EventInvite(
-                event_id=event.id,
-                invited_user_email=str(email),
-                invited_user_id=invited_user.id if invited_user else None,
-            )
-        )
+    _insert_invites(db, event.id, [str(email) for email in payload.invitees])
 
     db.commit()
-    db.refresh(event)
     return event
 
 
@@ -108,7 +127,7 @@ def update_event(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> EventOut:
-    require_membership(db, current_user.id, workspace_id)
+    require_membership(db, current_user, workspace_id)
 
     event = db.query(Event).filter(Event.id == event_id, Event.workspace_id == workspace_id).first()
     if not event:
@@ -130,24 +149,16 @@ def update_event(
         existing_invites = db.query(EventInvite).filter(EventInvite.event_id == event.id).all()
         existing_by_lower = {invite.invited_user_email.lower(): invite for invite in existing_invites}
 
-        for lower_email, invite in existing_by_lower.items():
-            if lower_email not in requested_by_lower:
-                db.delete(invite)
-
-        for lower_email, raw_email in requested_by_lower.items():
-            if lower_email in existing_by_lower:
-                continue
-            invited_user = db.query(User).filter(User.email == raw_email).first()
-            db.add(
-                EventInvite(
-                    event_id=event.id,
-                    invited_user_email=raw_email,
-                    invited_user_id=invited_user.id if invited_user else None,
-                )
-            )
+        removed = existing_by_lower.keys() - requested_by_lower.keys()
+        if removed:
+            removed_ids = [existing_by_lower[lower_email].id for lower_email in removed]
+            db.query(EventInvite).filter(EventInvite.id.in_(removed_ids)).delete(synchronize_session="evaluate")
+
+        added = requested_by_lower.keys() - existing_by_lower.keys()
+        new_emails = [raw_email for lower_email, raw_email in requested_by_lower.items() if lower_email in added]
+        _insert_invites(db, event.id, new_emails)
 
     db.commit()
-    db.refresh(event)
     return event
 
 
@@ -158,14 +169,16 @@ def delete_event(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> dict:
-    require_membership(db, current_user.id, workspace_id)
+    require_membership(db, current_user, workspace_id)
 
-    event = db.query(Event).filter(Event.id == event_id, Event.workspace_id == workspace_id).first()
-    if not event:
+    # event_invites.event_id is ON DELETE CASCADE, so one statement removes the event and its invites.
+    deleted = (
+        db.query(Event)
+        .filter(Event.id == event_id, Event.workspace_id == workspace_id)
+        .delete(synchronize_session=False)
+    )
+    if not deleted:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event not found")
-
-    db.query(EventInvite).filter(EventInvite.event_id == event.id).delete()
-    db.delete(event)
     db.commit()
     return {"message": "Event deleted", "id": event_id}
 
@@ -178,7 +191,7 @@ def invite_to_event(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> EventInviteOut:
-    require_membership(db, current_user.id, workspace_id)
+    require_membership(db, current_user, workspace_id)
 
     event = db.query(Event).filter(Event.id == event_id, Event.workspace_id == workspace_id).first()
     if not event:
@@ -192,7 +205,6 @@ def invite_to_event(
     )
     db.add(invite)
     db.commit()
-    db.refresh(invite)
     return invite
 
 
@@ -203,7 +215,7 @@ def list_event_invites(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> list[EventInviteOut]:
-    require_membership(db, current_user.id, workspace_id)
+    require_membership(db, current_user, workspace_id)
 
     event = db.query(Event).filter(Event.id == event_id, Event.workspace_id == workspace_id).first()
     if not event:
@@ -211,6 +223,7 @@ def list_event_invites(
 
     return (
         db.query(EventInvite)
+        .options(*_LIST_LOAD_OPTIONS)
         .filter(EventInvite.event_id == event_id)
         .order_by(EventInvite.invited_at.desc())
         .all()
@@ -218,17 +231,21 @@ def list_event_invites(
 
 
 @router.post("/invites/respond", response_model=EventInviteOut)
+@router.post("/invites/accept", response_model=EventInviteOut)
 def respond_invite(
     payload: EventInviteRespondRequest,
     workspace_id: int = Depends(get_workspace_id),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> EventInviteOut:
-    require_membership(db, current_user.id, workspace_id)
-
+    # Membership is enforced by the join itself: non-members find no invite and get the 404 below.
     invite = (
         db.query(EventInvite)
         .join(Event, Event.id == EventInvite.event_id)
+        .join(
+            WorkspaceMember,
+            and_(WorkspaceMember.workspace_id == Event.workspace_id, WorkspaceMember.user_id == current_user.id),
+        )
         .filter(
             EventInvite.id == payload.invite_id,
             Event.workspace_id == workspace_id,
@@ -241,20 +258,9 @@ def respond_invite(
 
     invite.status = payload.status
     db.commit()
-    db.refresh(invite)
     return invite
 
 
-@router.post("/invites/accept", response_model=EventInviteOut)
-def accept_invite_alias(
-    payload: EventInviteRespondRequest,
-    workspace_id: int = Depends(get_workspace_id),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-) -> EventInviteOut:
-    return respond_invite(payload, workspace_id, current_user, db)
-
-
 @router.post("/nl-create", response_model=EventDraft)
 def nl_create(
     payload: NLCreateRequest,
@@ -262,28 +268,37 @@ def nl_create(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> EventDraft:
-    require_membership(db, current_user.id, workspace_id)
+    require_membership(db, current_user, workspace_id)
     return ai_service.create_event_draft(db, current_user.id, workspace_id, payload.prompt)
 
 
-@router.post("/suggest-alternatives")
+@router.post("/suggest-alternatives", response_model=SuggestAlternativesResponse)
 def suggest_alternatives(
     payload: SuggestAlternativesRequest,
     workspace_id: int = Depends(get_workspace_id),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
-) -> dict:
-    require_membership(db, current_user.id, workspace_id)
+) -> SuggestAlternativesResponse:
+    require_membership(db, current_user, workspace_id)
+
+    if db.get_bind().dialect.name == "postgresql":
+        # Half-open [start, end) ranges overlap exactly when start_a < end_b and end_a > start_b;
+        # phrased as && it can use ix_events_workspace_time_range.
+        overlaps = func.tsrange(Event.start_at, Event.end_at).op("&&")(
+            func.tsrange(cast(payload.start_at, DateTime), cast(payload.end_at, DateTime))
+        )
+    else:
+        overlaps = and_(Event.start_at < payload.end_at, Event.end_at > payload.start_at)
 
     overlapping_events = (
         db.query(Event)
-        .filter(
-            Event.workspace_id == workspace_id,
-            and_(Event.start_at < payload.end_at, Event.end_at > payload.start_at),
-        )
+        .filter(Event.workspace_id == workspace_id, overlaps)
         .order_by(Event.start_at.asc())
         .all()
     )
+    # Nothing to move around: skip the suggestion pass (and its ai_runs log row) entirely.
+    if not overlapping_events:
+        return {"has_conflict": False, "conflicts": [], "suggestions": []}
 
     suggestions = ai_service.suggest_event_alternatives(
         db,
@@ -294,11 +309,8 @@ def suggest_alternatives(
         overlapping_events,
     )
 
-    return {
-        "has_conflict": bool(overlapping_events),
-        "conflicts": [EventOut.model_validate(ev).model_dump() for ev in overlapping_events],
-        "suggestions": [s.model_dump() for s in suggestions],
-    }
+    # response_model serialises the Event rows and suggestions in one pass; no intermediate dicts.
+    return {"has_conflict": True, "conflicts": overlapping_events, "suggestions": suggestions}
 
 
 @router.post("/generate-description", response_model=EventDescriptionResponse)
@@ -308,7 +320,7 @@ def generate_event_description(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> EventDescriptionResponse:
-    require_membership(db, current_user.id, workspace_id)
+    require_membership(db, current_user, workspace_id)
     return ai_service.generate_event_description(
         db,
         current_user.id,
@@ -328,7 +340,7 @@ def generate_invite_message(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> InviteMessageResponse:
-    require_membership(db, current_user.id, workspace_id)
+    require_membership(db, current_user, workspace_id)
     return ai_service.generate_invite_message(
         db,
         current_user.id,
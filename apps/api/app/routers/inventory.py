@@ -1,10 +1,18 @@
-from difflib import SequenceMatcher
+import codecs
+import heapq
+import math
+import operator
+import threading
+from functools import lru_cache
 
 from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, UploadFile, status
 from pydantic import ValidationError
-from sqlalchemy import String, case, func, or_
+from rapidfuzz import fuzz, process
+from sqlalchemy import Float, String, cast, func, or_
 from sqlalchemy.orm import Session
 
+from ..config import get_settings
+from ..database import contains_pattern
 from ..deps import get_current_user, get_db, get_workspace_id, require_membership
 from ..models import InventoryItem, InventoryStatus, User
 from ..schemas import (
@@ -30,10 +38,33 @@ from ..schemas import (
 from ..services.ai_service import ai_service
 
 router = APIRouter(prefix="/inventory", tags=["inventory"])
+settings = get_settings()
+
+UPLOAD_CHUNK_BYTES = 64 * 1024
+
+# Exactly the InventoryItemOut fields; list_items selects these as plain rows instead of hydrating items.
+_ITEM_OUT_COLUMNS = (
+    InventoryItem.id,
+    InventoryItem.workspace_id,
+    InventoryItem.name,
+    InventoryItem.normalized_name,
+    InventoryItem.vendor,
+    InventoryItem.category,
+    InventoryItem.quantity,
+    InventoryItem.unit,
+    InventoryItem.low_stock_threshold,
+    InventoryItem.status,
+)
+
+_ITEM_SEARCH_COLUMNS = (InventoryItem.name, InventoryItem.vendor, InventoryItem.category, InventoryItem.unit)
+
+
+# Statuses a caller sets explicitly and that quantity changes must not overwrite.
+_STICKY_STATUSES = frozenset({InventoryStatus.ordered, InventoryStatus.discontinued})
 
 
 def _resolved_status(payload_status: InventoryStatus | None, quantity: float, threshold: float) -> InventoryStatus:
-    if payload_status in {InventoryStatus.ordered, InventoryStatus.discontinued}:
+    if payload_status in _STICKY_STATUSES:
         return payload_status
     if quantity <= threshold:
         return InventoryStatus.low_stock
@@ -61,22 +92,25 @@ def _merge_into_existing_item(
     existing.status = _resolved_status(payload_status, existing.quantity, existing.low_stock_threshold)
 
 
+_UNIT_ALIASES = {
+    "units": "unit",
+    "unit": "unit",
+    "pieces": "piece",
+    "piece": "piece",
+    "packs": "pack",
+    "pack": "pack",
+}
+
+
+@lru_cache(maxsize=256)
 def _normalized_unit(unit: str | None) -> str:
     if not unit:
         return "units"
     normalized = unit.strip().lower()
-    aliases = {
-        "units": "unit",
-        "unit": "unit",
-        "pieces": "piece",
-        "piece": "piece",
-        "packs": "pack",
-        "pack": "pack",
-    }
-    normalized = aliases.get(normalized, normalized)
-    return normalized
+    return _UNIT_ALIASES.get(normalized, normalized)
 
 
+@lru_cache(maxsize=256)
 def _normalize_category_label(category: str | None) -> str | None:
     if category is None:
         return None
@@ -91,30 +125,115 @@ def _normalize_vendor_label(vendor: str | None) -> str | None:
     return cleaned or None
 
 
-def _find_duplicate_candidates(
+def _duplicate_length_band(normalized_name: str, min_similarity: float) -> tuple[int, int]:
+    # fuzz.ratio is 2 * matches / (len_a + len_b) and matches <= the shorter length, so any name scoring
+    # at least min_similarity has a length inside this band. Filtering on it in SQL loses no candidates.
+    name_length = len(normalized_name)
+    min_length = math.ceil(name_length * min_similarity / (2 - min_similarity) - 1e-9)
+    max_length = math.floor(name_length * (2 - min_similarity) / min_similarity + 1e-9)
+    return min_length, max_length
+
+
+# Just the fields _rank_duplicate_candidates reads.
+_DUPLICATE_POOL_COLUMNS = (
+    InventoryItem.id,
+    InventoryItem.name,
+    InventoryItem.normalized_name,
+    InventoryItem.unit,
+    InventoryItem.category,
+    InventoryItem.quantity,
+)
+
+
+def _load_duplicate_pool(
     db: Session,
     workspace_id: int,
-    item_name: str,
+    normalized_names: list[str],
+    min_similarity: float = 0.82,
+    columns: tuple = _DUPLICATE_POOL_COLUMNS,
+) -> list:
+    # One query for every workspace item that could be a duplicate of any of the given names.
+    if not normalized_names:
+        return []
+    bands = [_duplicate_length_band(name, min_similarity) for name in normalized_names]
+    return (
+        db.query(*columns)
+        .filter(
+            InventoryItem.workspace_id == workspace_id,
+            func.length(InventoryItem.normalized_name).between(
+                min(low for low, _ in bands), max(high for _, high in bands)
+            ),
+        )
+        .all()
+    )
+
+
+# workspace_id -> (version, pool, pool names) for suggest_duplicates. The version is the item count plus
+# the newest updated_at, so any insert, update or delete moves it and a stale snapshot is never reused.
+DUPLICATE_INDEX_MAX_ENTRIES = 128
+_duplicate_index_cache: dict[int, tuple[tuple, list, list[str]]] = {}
+_duplicate_index_cache_lock = threading.Lock()
+
+
+def _workspace_duplicate_index(db: Session, workspace_id: int) -> tuple[list, list[str]]:
+    version = tuple(
+        db.query(func.count(InventoryItem.id), func.max(InventoryItem.updated_at))
+        .filter(InventoryItem.workspace_id == workspace_id)
+        .one()
+    )
+    cached = _duplicate_index_cache.get(workspace_id)
+    if cached and cached[0] == version:
+        return cached[1], cached[2]
+
+    pool = db.query(*_DUPLICATE_POOL_COLUMNS).filter(InventoryItem.workspace_id == workspace_id).all()
+    pool_names = [existing.normalized_name for existing in pool]
+
+    with _duplicate_index_cache_lock:
+        _duplicate_index_cache.pop(workspace_id, None)
+        if len(_duplicate_index_cache) >= DUPLICATE_INDEX_MAX_ENTRIES:
+            _duplicate_index_cache.pop(next(iter(_duplicate_index_cache)))
+        _duplicate_index_cache[workspace_id] = (version, pool, pool_names)
+    return pool, pool_names
+
+
+def _rank_duplicate_candidates(
+    pool: list,
+    pool_names: list[str],
+    normalized_name: str,
     unit: str | None,
     min_similarity: float = 0.82,
 ) -> list[DuplicateSuggestionCandidate]:
-    normalized_name = ai_service.normalize_item_name(item_name)
     unit_norm = _normalized_unit(unit)
 
-    existing_items = db.query(InventoryItem).filter(InventoryItem.workspace_id == workspace_id).all()
+    # RapidFuzz scores every name in C++ and drops those under the cutoff before Python sees them.
+    # Exact matches always score 100, so the cutoff never hides them.
+    matches = process.extract(
+        normalized_name,
+        pool_names,
+        scorer=fuzz.ratio,
+        score_cutoff=min_similarity * 100,
+        limit=None,
+    )
+    # Pick the top three on a precomputed key (exact first, then score, then name) before building any
+    # response models; nsmallest keeps the same order and tie-breaking as a full stable sort.
+    top_matches = heapq.nsmallest(
+        3,
+        matches,
+        key=lambda match: (
+            pool_names[match[2]] != normalized_name,
+            -round(match[1] / 100, 3),
+            pool[match[2]].name.lower(),
+        ),
+    )
     candidates: list[DuplicateSuggestionCandidate] = []
-    for existing in existing_items:
-        similarity = SequenceMatcher(None, normalized_name, existing.normalized_name).ratio()
-        is_exact = normalized_name == existing.normalized_name
-        if not is_exact and similarity < min_similarity:
-            continue
-
-        existing_unit_norm = _normalized_unit(existing.unit)
-        unit_matches = existing_unit_norm == unit_norm
-        if is_exact:
+    for _, score, index in top_matches:
+        existing = pool[index]
+        if existing.normalized_name == normalized_name:
             reason = "exact_name"
+        elif _normalized_unit(existing.unit) == unit_norm:
+            reason = "similar_name"
         else:
-            reason = "similar_name" if unit_matches else "similar_name_unit_mismatch"
+            reason = "similar_name_unit_mismatch"
 
         candidates.append(
             DuplicateSuggestionCandidate(
@@ -123,13 +242,60 @@ def _find_duplicate_candidates(
                 unit=existing.unit,
                 category=existing.category,
                 quantity=existing.quantity,
-                similarity_score=round(similarity, 3),
+                similarity_score=round(score / 100, 3),
                 reason=reason,
             )
         )
+    return candidates
+
+
+def _find_duplicate_candidates(
+    db: Session,
+    workspace_id: int,
+    item_name: str,
+    unit: str | None,
+    min_similarity: float = 0.82,
+) -> list[DuplicateSuggestionCandidate]:
+    normalized_name = ai_service.normalize_item_name(item_name)
+    pool = _load_duplicate_pool(db, workspace_id, [normalized_name], min_similarity)
+    pool_names = [existing.normalized_name for existing in pool]
+    return _rank_duplicate_candidates(pool, pool_names, normalized_name, unit, min_similarity)
+
 
-    candidates.sort(key=lambda c: ((c.reason != "exact_name"), -c.similarity_score, c.name.lower()))
-    return candidates[:3]
+def _find_duplicate_merge_target(
+    db: Session,
+    workspace_id: int,
+    item_name: str,
+    unit: str | None,
+) -> InventoryItem | None:
+    # Same ranking as _find_duplicate_candidates, but the pool is loaded as items so the winner can be
+    # merged into directly without fetching it again by id.
+    normalized_name = ai_service.normalize_item_name(item_name)
+    pool = _load_duplicate_pool(db, workspace_id, [normalized_name], columns=(InventoryItem,))
+    pool_by_id = {existing.id: existing for existing in pool}
+    pool_names = [existing.normalized_name for existing in pool]
+    candidates = _rank_duplicate_candidates(pool, pool_names, normalized_name, unit)
+    return pool_by_id[candidates[0].item_id] if candidates else None
+
+
+async def _read_import_text(text: str | None, file: UploadFile | None) -> str:
+    # Decode the upload chunk by chunk and join once, rejecting it as soon as it passes the size limit.
+    if not file:
+        return text or ""
+
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+    parts = [text or "", "\n"]
+    total_bytes = 0
+    while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+        total_bytes += len(chunk)
+        if total_bytes > settings.import_max_upload_bytes:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Upload exceeds {settings.import_max_upload_bytes} bytes",
+            )
+        parts.append(decoder.decode(chunk))
+    parts.append(decoder.decode(b"", final=True))
+    return "".join(parts).strip()
 
 
 @router.get("/items", response_model=list[InventoryItemOut])
@@ -141,19 +307,14 @@ def list_items(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> list[InventoryItemOut]:
-    require_membership(db, current_user.id, workspace_id)
+    require_membership(db, current_user, workspace_id)
 
-    q = db.query(InventoryItem).filter(InventoryItem.workspace_id == workspace_id)
+    q = db.query(*_ITEM_OUT_COLUMNS).filter(InventoryItem.workspace_id == workspace_id)
     if query:
-        like = f"%{query.lower()}%"
-        q = q.filter(
-            or_(
-                func.lower(InventoryItem.name).like(like),
-                func.lower(func.coalesce(InventoryItem.vendor, "")).like(like),
-                func.lower(func.coalesce(InventoryItem.category, "")).like(like),
-                func.lower(func.coalesce(InventoryItem.unit, "")).like(like),
-            )
-        )
+        # ILIKE on the bare columns lets Postgres use the pg_trgm indexes (ix_inventory_items_*_trgm);
+        # a NULL vendor/category/unit simply fails its branch of the OR.
+        pattern = contains_pattern(query)
+        q = q.filter(or_(*(column.ilike(pattern, escape="\\") for column in _ITEM_SEARCH_COLUMNS)))
     if category:
         q = q.filter(InventoryItem.category == category)
     if status_filter:
@@ -168,7 +329,7 @@ def create_item(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> InventoryItemOut:
-    require_membership(db, current_user.id, workspace_id)
+    require_membership(db, current_user, workspace_id)
 
     normalized_name = ai_service.normalize_item_name(payload.name)
     vendor = _normalize_vendor_label(payload.vendor)
@@ -222,7 +383,7 @@ def update_item(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> InventoryItemOut:
-    require_membership(db, current_user.id, workspace_id)
+    require_membership(db, current_user, workspace_id)
 
     item = db.query(InventoryItem).filter(InventoryItem.id == item_id, InventoryItem.workspace_id == workspace_id).first()
     if not item:
@@ -256,7 +417,7 @@ def delete_item(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> dict:
-    require_membership(db, current_user.id, workspace_id)
+    require_membership(db, current_user, workspace_id)
 
     item = db.query(InventoryItem).filter(InventoryItem.id == item_id, InventoryItem.workspace_id == workspace_id).first()
     if not item:
@@ -275,14 +436,9 @@ async def parse_import(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> ReceiptExtraction:
-    require_membership(db, current_user.id, workspace_id)
-
-    raw_text = text or ""
-    if file:
-        data = await file.read()
-        decoded = data.decode("utf-8", errors="ignore")
-        raw_text = f"{raw_text}\n{decoded}".strip()
+    require_membership(db, current_user, workspace_id)
 
+    raw_text = await _read_import_text(text, file)
     if not raw_text:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Provide text or file content")
 
@@ -297,11 +453,15 @@ def suggest_duplicates(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> InventoryDuplicateSuggestionResponse:
-    require_membership(db, current_user.id, workspace_id)
+    require_membership(db, current_user, workspace_id)
+
+    # One snapshot of the workspace covers every import row; each row is then ranked against it in memory.
+    normalized_names = [ai_service.normalize_item_name(entry.name) for entry in payload.items]
+    pool, pool_names = _workspace_duplicate_index(db, workspace_id)
 
     suggestions: list[DuplicateSuggestionForImportItem] = []
     for idx, entry in enumerate(payload.items):
-        candidates = _find_duplicate_candidates(db, workspace_id, entry.name, entry.unit)
+        candidates = _rank_duplicate_candidates(pool, pool_names, normalized_names[idx], entry.unit)
         if candidates and candidates[0].reason == "exact_name":
             recommended_action = ImportDuplicateAction.merge
             recommended_merge_item_id = candidates[0].item_id
@@ -334,11 +494,8 @@ async def upload_import(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> dict:
-    require_membership(db, current_user.id, workspace_id)
-    raw_text = text or ""
-    if file:
-        data = await file.read()
-        raw_text = f"{raw_text}\n{data.decode('utf-8', errors='ignore')}".strip()
+    require_membership(db, current_user, workspace_id)
+    raw_text = await _read_import_text(text, file)
     if not raw_text:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Provide text or file content")
     return {"raw_text": raw_text}
@@ -351,46 +508,52 @@ def commit_import(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> list[InventoryItemOut]:
-    require_membership(db, current_user.id, workspace_id)
+    require_membership(db, current_user, workspace_id)
 
-    upserted_items: dict[int, InventoryItem] = {}
     for entry in payload.items:
-        action = entry.duplicate_action
-        if action == ImportDuplicateAction.review:
+        if entry.duplicate_action == ImportDuplicateAction.review:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Duplicate review not resolved for item '{entry.name}'. Choose merge or create_new.",
             )
 
-        normalized_name = ai_service.normalize_item_name(entry.name)
+    # Load every exact-name match and explicit merge target for the whole import in one query.
+    normalized_names = [ai_service.normalize_item_name(entry.name) for entry in payload.items]
+    merge_item_ids = {entry.merge_item_id for entry in payload.items if entry.merge_item_id}
+    preloaded = (
+        db.query(InventoryItem)
+        .filter(
+            InventoryItem.workspace_id == workspace_id,
+            or_(InventoryItem.normalized_name.in_(set(normalized_names)), InventoryItem.id.in_(merge_item_ids)),
+        )
+        .order_by(InventoryItem.id.asc())
+        .all()
+    )
+    items_by_id = {item.id: item for item in preloaded}
+    items_by_name: dict[str, InventoryItem] = {}
+    for item in preloaded:
+        items_by_name.setdefault(item.normalized_name, item)
+
+    # Keyed by object identity: new items have no primary key until the single flush at commit.
+    upserted_items: dict[int, InventoryItem] = {}
+    for entry, normalized_name in zip(payload.items, normalized_names):
+        action = entry.duplicate_action
         vendor = _normalize_vendor_label(entry.vendor)
         category = _normalize_category_label(entry.category) or ai_service.suggest_category(entry.name)
         unit = entry.unit or "units"
 
-        exact_existing = (
-            db.query(InventoryItem)
-            .filter(InventoryItem.workspace_id == workspace_id, InventoryItem.normalized_name == normalized_name)
-            .first()
-        )
+        exact_existing = items_by_name.get(normalized_name)
 
         if action == ImportDuplicateAction.merge:
             merge_target: InventoryItem | None = None
             if entry.merge_item_id:
-                merge_target = (
-                    db.query(InventoryItem)
-                    .filter(InventoryItem.workspace_id == workspace_id, InventoryItem.id == entry.merge_item_id)
-                    .first()
-                )
+                merge_target = items_by_id.get(entry.merge_item_id)
             if not merge_target:
                 merge_target = exact_existing
             if not merge_target:
-                candidates = _find_duplicate_candidates(db, workspace_id, entry.name, entry.unit)
-                if candidates:
-                    merge_target = (
-                        db.query(InventoryItem)
-                        .filter(InventoryItem.workspace_id == workspace_id, InventoryItem.id == candidates[0].item_id)
-                        .first()
-                    )
+                # Rare path: flush pending new items so the fuzzy lookup can see them.
+                db.flush()
+                merge_target = _find_duplicate_merge_target(db, workspace_id, entry.name, entry.unit)
 
             if not merge_target:
                 raise HTTPException(
@@ -407,7 +570,7 @@ def commit_import(
                 low_stock_threshold=None,
                 payload_status=None,
             )
-            upserted_items[merge_target.id] = merge_target
+            upserted_items[id(merge_target)] = merge_target
             continue
 
         if action in {ImportDuplicateAction.auto, ImportDuplicateAction.create_new}:
@@ -421,7 +584,7 @@ def commit_import(
                     low_stock_threshold=None,
                     payload_status=None,
                 )
-                upserted_items[exact_existing.id] = exact_existing
+                upserted_items[id(exact_existing)] = exact_existing
                 continue
 
         threshold = 1
@@ -439,15 +602,66 @@ def commit_import(
             created_by=current_user.id,
         )
         db.add(item)
-        db.flush()
-        upserted_items[item.id] = item
+        upserted_items[id(item)] = item
+        items_by_name.setdefault(normalized_name, item)
 
+    # New items go out in one batched INSERT ... RETURNING (insertmanyvalues), not one flush per row.
     db.commit()
-    for item in upserted_items.values():
-        db.refresh(item)
     return list(upserted_items.values())
 
 
+# Copilot plan dispatch tables, built once at import instead of per tool call.
+_LOW_STOCK_CONDITION = (InventoryItem.quantity <= InventoryItem.low_stock_threshold) | (
+    InventoryItem.status == InventoryStatus.low_stock
+)
+_COPILOT_TEXT_FILTER_COLUMNS = {
+    InventoryPlannerFilterField.name: InventoryItem.name,
+    InventoryPlannerFilterField.vendor: InventoryItem.vendor,
+    InventoryPlannerFilterField.category: InventoryItem.category,
+    InventoryPlannerFilterField.unit: InventoryItem.unit,
+}
+_COPILOT_QUANTITY_OPERATORS = {
+    InventoryPlannerFilterOperator.eq: operator.eq,
+    InventoryPlannerFilterOperator.lt: operator.lt,
+    InventoryPlannerFilterOperator.lte: operator.le,
+    InventoryPlannerFilterOperator.gt: operator.gt,
+    InventoryPlannerFilterOperator.gte: operator.ge,
+}
+_COPILOT_SORT_COLUMNS = {
+    "name": InventoryItem.name,
+    "quantity": InventoryItem.quantity,
+    "vendor": InventoryItem.vendor,
+    "category": InventoryItem.category,
+    "status": InventoryItem.status,
+    "unit": InventoryItem.unit,
+}
+_COPILOT_ROW_COLUMNS = (
+    InventoryItem.id,
+    InventoryItem.name,
+    InventoryItem.vendor,
+    InventoryItem.category,
+    InventoryItem.quantity,
+    InventoryItem.unit,
+    InventoryItem.status,
+)
+_COPILOT_GROUP_COLUMNS = {
+    InventoryPlannerGroupBy.category: func.lower(func.trim(InventoryItem.category)),
+    InventoryPlannerGroupBy.vendor: func.lower(func.trim(func.coalesce(InventoryItem.vendor, ""))),
+    InventoryPlannerGroupBy.status: func.lower(func.trim(func.cast(InventoryItem.status, String))),
+    InventoryPlannerGroupBy.unit: func.lower(func.trim(InventoryItem.unit)),
+    InventoryPlannerGroupBy.item: func.lower(func.trim(InventoryItem.name)),
+}
+_ITEM_COUNT_EXPR = func.count(InventoryItem.id)
+_QUANTITY_SUM_EXPR = func.coalesce(func.sum(InventoryItem.quantity), 0.0)
+# COUNT(...) FILTER (WHERE ...) skips the per-row CASE; Postgres and SQLite 3.30+ both support it.
+_LOW_STOCK_COUNT_EXPR = func.count(InventoryItem.id).filter(_LOW_STOCK_CONDITION)
+_COPILOT_GROUP_METRIC_EXPRS = {
+    InventoryPlannerMetric.sum_quantity: _QUANTITY_SUM_EXPR,
+    InventoryPlannerMetric.count_low_stock: _LOW_STOCK_COUNT_EXPR,
+    InventoryPlannerMetric.low_stock_ratio: cast(_LOW_STOCK_COUNT_EXPR, Float) / _ITEM_COUNT_EXPR,
+}
+
+
 @router.post("/copilot", response_model=CopilotResponse)
 def copilot(
     payload: CopilotRequest,
@@ -455,7 +669,7 @@ def copilot(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> CopilotResponse:
-    require_membership(db, current_user.id, workspace_id)
+    require_membership(db, current_user, workspace_id)
 
     def execute_query_plan_tool(plan_dict: dict) -> dict:
         try:
@@ -464,9 +678,6 @@ def copilot(
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid copilot plan: {exc}") from exc
 
         limit = max(1, min(plan.limit, 100))
-        low_stock_condition = (InventoryItem.quantity <= InventoryItem.low_stock_threshold) | (
-            InventoryItem.status == InventoryStatus.low_stock
-        )
         query_builder = db.query(InventoryItem).filter(InventoryItem.workspace_id == workspace_id)
 
         for plan_filter in plan.filters:
@@ -474,18 +685,8 @@ def copilot(
             value = plan_filter.value
             field = plan_filter.field
 
-            if field in {
-                InventoryPlannerFilterField.name,
-                InventoryPlannerFilterField.vendor,
-                InventoryPlannerFilterField.category,
-                InventoryPlannerFilterField.unit,
-            }:
-                column = {
-                    InventoryPlannerFilterField.name: InventoryItem.name,
-                    InventoryPlannerFilterField.vendor: InventoryItem.vendor,
-                    InventoryPlannerFilterField.category: InventoryItem.category,
-                    InventoryPlannerFilterField.unit: InventoryItem.unit,
-                }[field]
+            column = _COPILOT_TEXT_FILTER_COLUMNS.get(field)
+            if column is not None:
                 value_str = str(value).strip().lower()
                 if op == InventoryPlannerFilterOperator.eq:
                     query_builder = query_builder.filter(func.lower(func.coalesce(column, "")) == value_str)
@@ -511,18 +712,11 @@ def copilot(
                     quantity_value = float(value)
                 except (TypeError, ValueError) as exc:
                     raise HTTPException(status_code=400, detail=f"Invalid quantity value '{value}'") from exc
-                if op == InventoryPlannerFilterOperator.eq:
-                    query_builder = query_builder.filter(InventoryItem.quantity == quantity_value)
-                elif op == InventoryPlannerFilterOperator.lt:
-                    query_builder = query_builder.filter(InventoryItem.quantity < quantity_value)
-                elif op == InventoryPlannerFilterOperator.lte:
-                    query_builder = query_builder.filter(InventoryItem.quantity <= quantity_value)
-                elif op == InventoryPlannerFilterOperator.gt:
-                    query_builder = query_builder.filter(InventoryItem.quantity > quantity_value)
-                elif op == InventoryPlannerFilterOperator.gte:
-                    query_builder = query_builder.filter(InventoryItem.quantity >= quantity_value)
-                else:
-                    raise HTTPException(status_code=400, detail=f"Unsupported operator '{op}' for quantity")
+                try:
+                    compare = _COPILOT_QUANTITY_OPERATORS[op]
+                except KeyError as exc:
+                    raise HTTPException(status_code=400, detail=f"Unsupported operator '{op}' for quantity") from exc
+                query_builder = query_builder.filter(compare(InventoryItem.quantity, quantity_value))
                 continue
 
             if field == InventoryPlannerFilterField.low_stock:
@@ -532,28 +726,25 @@ def copilot(
                 if isinstance(low_stock_value, str):
                     low_stock_value = low_stock_value.strip().lower() in {"true", "1", "yes"}
                 if bool(low_stock_value):
-                    query_builder = query_builder.filter(low_stock_condition)
+                    query_builder = query_builder.filter(_LOW_STOCK_CONDITION)
                 else:
-                    query_builder = query_builder.filter(~low_stock_condition)
+                    query_builder = query_builder.filter(~_LOW_STOCK_CONDITION)
                 continue
 
         if plan.group_by == InventoryPlannerGroupBy.none:
             if plan.metric == InventoryPlannerMetric.rows:
-                sort_columns = {
-                    "name": InventoryItem.name,
-                    "quantity": InventoryItem.quantity,
-                    "vendor": InventoryItem.vendor,
-                    "category": InventoryItem.category,
-                    "status": InventoryItem.status,
-                    "unit": InventoryItem.unit,
-                }
-                sort_column = sort_columns.get(plan.sort_by, InventoryItem.name)
+                sort_column = _COPILOT_SORT_COLUMNS.get(plan.sort_by, InventoryItem.name)
                 order_by_clause = (
                     sort_column.desc()
                     if plan.sort_direction == InventoryPlannerSortDirection.desc
                     else sort_column.asc()
                 )
-                rows = query_builder.order_by(order_by_clause).limit(limit).all()
+                rows = (
+                    query_builder.with_entities(*_COPILOT_ROW_COLUMNS)
+                    .order_by(order_by_clause)
+                    .limit(limit)
+                    .all()
+                )
                 return {
                     "kind": "rows",
                     "metric": plan.metric.value,
@@ -566,7 +757,7 @@ def copilot(
                             "category": row.category,
                             "quantity": row.quantity,
                             "unit": row.unit,
-                            "status": row.status.value if isinstance(row.status, InventoryStatus) else str(row.status),
+                            "status": row.status.value,
                         }
                         for row in rows
                     ],
@@ -577,10 +768,9 @@ def copilot(
             elif plan.metric == InventoryPlannerMetric.sum_quantity:
                 metric_value = query_builder.with_entities(func.coalesce(func.sum(InventoryItem.quantity), 0)).scalar() or 0
             elif plan.metric == InventoryPlannerMetric.count_low_stock:
-                metric_value = query_builder.filter(low_stock_condition).count()
+                metric_value = query_builder.filter(_LOW_STOCK_CONDITION).count()
             elif plan.metric == InventoryPlannerMetric.low_stock_ratio:
-                total_count = query_builder.count()
-                low_count = query_builder.filter(low_stock_condition).count()
+                total_count, low_count = query_builder.with_entities(_ITEM_COUNT_EXPR, _LOW_STOCK_COUNT_EXPR).one()
                 metric_value = 0 if total_count == 0 else round(low_count / total_count, 4)
             else:
                 metric_value = query_builder.count()
@@ -592,22 +782,29 @@ def copilot(
                 "metric_value": metric_value,
             }
 
-        group_column = {
-            InventoryPlannerGroupBy.category: func.lower(func.trim(InventoryItem.category)),
-            InventoryPlannerGroupBy.vendor: func.lower(func.trim(func.coalesce(InventoryItem.vendor, ""))),
-            InventoryPlannerGroupBy.status: func.lower(func.trim(func.cast(InventoryItem.status, String))),
-            InventoryPlannerGroupBy.unit: func.lower(func.trim(InventoryItem.unit)),
-            InventoryPlannerGroupBy.item: func.lower(func.trim(InventoryItem.name)),
-        }[plan.group_by]
+        group_column = _COPILOT_GROUP_COLUMNS[plan.group_by]
+        metric_expr = _COPILOT_GROUP_METRIC_EXPRS.get(plan.metric, _ITEM_COUNT_EXPR)
+
+        # Sort and cut to the top `limit` groups in SQL rather than materialising every group. The sort key
+        # matches the returned label, so blank groups (e.g. missing vendors) sort as "unknown".
+        group_sort_expr = func.coalesce(func.nullif(group_column, ""), "unknown")
+        if plan.sort_by == "group":
+            order_by_clauses = [group_sort_expr]
+        else:
+            order_by_clauses = [metric_expr, group_sort_expr]
+        if plan.sort_direction == InventoryPlannerSortDirection.desc:
+            order_by_clauses[0] = order_by_clauses[0].desc()
 
         grouped_rows = (
             query_builder.with_entities(
                 group_column.label("group"),
-                func.count(InventoryItem.id).label("item_count"),
-                func.coalesce(func.sum(InventoryItem.quantity), 0.0).label("quantity_sum"),
-                func.sum(case((low_stock_condition, 1), else_=0)).label("low_stock_count"),
+                _ITEM_COUNT_EXPR.label("item_count"),
+                _QUANTITY_SUM_EXPR.label("quantity_sum"),
+                _LOW_STOCK_COUNT_EXPR.label("low_stock_count"),
             )
             .group_by(group_column)
+            .order_by(*order_by_clauses)
+            .limit(limit)
             .all()
         )
 
@@ -638,17 +835,11 @@ def copilot(
                 }
             )
 
-        reverse = plan.sort_direction == InventoryPlannerSortDirection.desc
-        if plan.sort_by == "group":
-            computed_rows.sort(key=lambda r: str(r.get(plan.group_by.value, "")), reverse=reverse)
-        else:
-            computed_rows.sort(key=lambda r: float(r.get("metric", 0)), reverse=reverse)
-
         return {
             "kind": "grouped",
             "metric": plan.metric.value,
             "group_by": plan.group_by.value,
-            "rows": computed_rows[:limit],
+            "rows": computed_rows,
         }
 
     return ai_service.inventory_copilot(
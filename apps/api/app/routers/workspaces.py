@@ -1,10 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import hashlib
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from pydantic import TypeAdapter
+from sqlalchemy import and_
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 
-from ..deps import get_current_user, get_db, require_membership
+from ..deps import get_current_user, get_db, invalidate_membership_cache, require_membership
 from ..models import Role, User, Workspace, WorkspaceMember
 from ..schemas import (
     WorkspaceCreateRequest,
+    WorkspaceMemberBulkInviteRequest,
     WorkspaceMemberInviteRequest,
     WorkspaceMemberOut,
     WorkspaceMemberRoleUpdateByEmailRequest,
@@ -16,122 +23,164 @@ router = APIRouter(prefix="/workspaces", tags=["workspaces"])
 
 
 @router.post("", response_model=WorkspaceOut)
-def create_workspace(
-    payload: WorkspaceCreateRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-) -> WorkspaceOut:
-    _ = payload, current_user, db
+def create_workspace(payload: WorkspaceCreateRequest) -> WorkspaceOut:
+    # No Depends parameters: the request is refused without decoding a token or checking out a connection.
+    _ = payload
     raise HTTPException(
         status_code=status.HTTP_403_FORBIDDEN,
         detail="Workspace creation is disabled in single-team mode",
     )
 
 
+def _add_members(db: Session, workspace_id: int, user_ids: list[int]) -> set[int]:
+    # One bare INSERT ... ON CONFLICT DO NOTHING for all rows: no ORM flush for rows we never read back, and
+    # users who are already members (or are added concurrently) are skipped instead of raising IntegrityError.
+    if not user_ids:
+        return set()
+    dialect_insert = postgresql_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    result = db.execute(
+        dialect_insert(WorkspaceMember)
+        .values([{"workspace_id": workspace_id, "user_id": user_id, "role": Role.member} for user_id in user_ids])
+        .on_conflict_do_nothing(index_elements=["workspace_id", "user_id"])
+        .returning(WorkspaceMember.user_id)
+    )
+    return set(result.scalars().all())
+
+
 @router.post("/{workspace_id}/members/invite")
+@router.post("/{workspace_id}/invite_member")
 def invite_member(
     workspace_id: int,
     payload: WorkspaceMemberInviteRequest,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> dict:
-    require_membership(db, current_user.id, workspace_id, admin_only=True)
-
-    invited_user = db.query(User).filter(User.email == payload.email).first()
-    if not invited_user:
+    require_membership(db, current_user, workspace_id, admin_only=True)
+
+    # The invitee and any existing membership of theirs in this workspace, in one round trip.
+    row = (
+        db.query(User, WorkspaceMember)
+        .outerjoin(
+            WorkspaceMember,
+            and_(WorkspaceMember.user_id == User.id, WorkspaceMember.workspace_id == workspace_id),
+        )
+        .filter(User.email == payload.email)
+        .first()
+    )
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User with this email must register first",
         )
 
-    existing = (
-        db.query(WorkspaceMember)
-        .filter(WorkspaceMember.workspace_id == workspace_id, WorkspaceMember.user_id == invited_user.id)
-        .first()
-    )
+    invited_user, existing = row
     if existing:
         if existing.role != Role.admin:
             existing.role = Role.member
         db.commit()
+        invalidate_membership_cache(invited_user.id, workspace_id)
         return {
             "message": "Existing member already linked",
             "member": {"name": invited_user.name, "email": invited_user.email, "role": existing.role.value},
         }
 
-    membership = WorkspaceMember(
-        workspace_id=workspace_id,
-        user_id=invited_user.id,
-        role=Role.member,
-    )
-    db.add(membership)
+    added_user_ids = _add_members(db, workspace_id, [invited_user.id])
     db.commit()
+    if not added_user_ids:
+        return {
+            "message": "Existing member already linked",
+            "member": {"name": invited_user.name, "email": invited_user.email, "role": Role.member.value},
+        }
     return {
         "message": "Member added",
         "member": {"name": invited_user.name, "email": invited_user.email, "role": Role.member.value},
     }
 
 
-@router.post("/{workspace_id}/invite_member")
-def invite_member_alias(
+@router.post("/{workspace_id}/members/bulk-invite")
+def bulk_invite_members(
     workspace_id: int,
-    payload: WorkspaceMemberInviteRequest,
+    payload: WorkspaceMemberBulkInviteRequest,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> dict:
-    return invite_member(workspace_id, payload, current_user, db)
+    require_membership(db, current_user, workspace_id, admin_only=True)
+
+    emails = list(dict.fromkeys(payload.emails))
+    users = db.query(User.id, User.email).filter(User.email.in_(emails)).all()
+    user_ids_by_email = {user.email: user.id for user in users}
+    added_user_ids = _add_members(db, workspace_id, list(user_ids_by_email.values()))
+    db.commit()
 
+    return {
+        "message": f"{len(added_user_ids)} member(s) added",
+        "added": [email for email in emails if user_ids_by_email.get(email) in added_user_ids],
+        "already_members": [
+            email
+            for email in emails
+            if email in user_ids_by_email and user_ids_by_email[email] not in added_user_ids
+        ],
+        "not_registered": [email for email in emails if email not in user_ids_by_email],
+    }
+
+
+_MEMBER_LIST_ADAPTER = TypeAdapter(list[WorkspaceMemberOut])
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    # If-None-Match may be "*" or a comma-separated list, and uses the weak comparison (W/ is ignored).
+    if not if_none_match:
+        return False
+    weak_etag = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == weak_etag:
+            return True
+    return False
 
-@router.get("/{workspace_id}/members", response_model=list[WorkspaceMemberOut])
+
+@router.get(
+    "/{workspace_id}/members",
+    response_model=list[WorkspaceMemberOut],
+    responses={status.HTTP_304_NOT_MODIFIED: {"description": "Member list unchanged since the If-None-Match ETag"}},
+)
 def list_members(
     workspace_id: int,
+    request: Request,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
-) -> list[WorkspaceMemberOut]:
-    require_membership(db, current_user.id, workspace_id, admin_only=True)
+) -> Response:
+    require_membership(db, current_user, workspace_id, admin_only=True)
 
     rows = (
-        db.query(WorkspaceMember, User)
+        db.query(User.name, User.email, WorkspaceMember.role, WorkspaceMember.created_at.label("joined_at"))
         .join(User, User.id == WorkspaceMember.user_id)
         .filter(WorkspaceMember.workspace_id == workspace_id)
         .order_by(User.name.asc(), User.email.asc())
         .all()
     )
-    return [
-        WorkspaceMemberOut(name=user.name, email=user.email, role=membership.role, joined_at=membership.created_at)
-        for membership, user in rows
-    ]
+    # The ETag hashes the serialized roster itself, so any change to a member's name, email, role or the
+    # membership set produces a new tag. A client revalidating an unchanged list gets a bodiless 304.
+    body = _MEMBER_LIST_ADAPTER.dump_json(_MEMBER_LIST_ADAPTER.validate_python(rows, from_attributes=True))
+    etag = f'"{hashlib.blake2s(body, digest_size=16).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
 
+_ROLE_UPDATES_DISABLED = "Role updates are disabled: users are members by default and the bootstrap admin is fixed"
 
+
+# The disabled endpoints below take no Depends parameters, so FastAPI rejects them without decoding a token or
+# checking out a database connection. Bodies are still declared (and validated) to keep the documented shape.
 @router.patch("/{workspace_id}/members/by-email")
-def update_member_role_by_email(
-    workspace_id: int,
-    payload: WorkspaceMemberRoleUpdateByEmailRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-) -> dict:
-    user = db.query(User).filter(User.email == payload.email).first()
-    if not user:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-    return update_member_role(
-        workspace_id=workspace_id,
-        user_id=user.id,
-        payload=WorkspaceMemberRoleUpdateRequest(role=payload.role),
-        current_user=current_user,
-        db=db,
-    )
+def update_member_role_by_email(workspace_id: int, payload: WorkspaceMemberRoleUpdateByEmailRequest) -> dict:
+    _ = workspace_id, payload
+    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=_ROLE_UPDATES_DISABLED)
 
 
 @router.patch("/{workspace_id}/members/{user_id}")
-def update_member_role(
-    workspace_id: int,
-    user_id: int,
-    payload: WorkspaceMemberRoleUpdateRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-) -> dict:
-    _ = user_id, payload
-    require_membership(db, current_user.id, workspace_id, admin_only=True)
-    raise HTTPException(
-        status_code=status.HTTP_400_BAD_REQUEST,
-        detail="Role updates are disabled: users are members by default and the bootstrap admin is fixed",
-    )
+def update_member_role(workspace_id: int, user_id: int, payload: WorkspaceMemberRoleUpdateRequest) -> dict:
+    _ = workspace_id, user_id, payload
+    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=_ROLE_UPDATES_DISABLED)
@@ -1,11 +1,34 @@
 import enum
+import re
 from datetime import datetime
-from typing import Any
+from typing import Annotated, Any
 
-from pydantic import BaseModel, EmailStr, Field, model_validator
+from pydantic import AfterValidator, BaseModel, EmailStr, Field, WithJsonSchema, model_validator
 
 from .models import EventAttendance, InventoryStatus, Role
 
+# For response models: addresses read back from the database were validated as EmailStr on the way in,
+# so re-running email-validator on every serialised row is pure cost. The schema still says format=email.
+StoredEmail = Annotated[str, WithJsonSchema({"type": "string", "format": "email"})]
+
+_LOOKUP_EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+
+def _normalize_lookup_email(value: str) -> str:
+    value = value.strip()
+    if not _LOOKUP_EMAIL_RE.match(value):
+        raise ValueError("value is not a valid email address")
+    # Same normal form EmailStr stores at registration: local part as typed, domain lowercased.
+    local_part, domain = value.rsplit("@", 1)
+    return f"{local_part}@{domain.lower()}"
+
+
+# For request fields that only look up an existing user: a wrong address just finds nobody, so a cheap shape
+# check replaces email-validator's full parse. Registration and login keep EmailStr.
+LookupEmail = Annotated[
+    str, AfterValidator(_normalize_lookup_email), WithJsonSchema({"type": "string", "format": "email"})
+]
+
 
 class TokenResponse(BaseModel):
     access_token: str
@@ -28,16 +51,20 @@ class WorkspaceCreateRequest(BaseModel):
 
 
 class WorkspaceMemberInviteRequest(BaseModel):
-    email: EmailStr
+    email: LookupEmail
     role: Role = Role.member
 
 
+class WorkspaceMemberBulkInviteRequest(BaseModel):
+    emails: list[LookupEmail] = Field(min_length=1, max_length=500)
+
+
 class WorkspaceMemberRoleUpdateRequest(BaseModel):
     role: Role
 
 
 class WorkspaceMemberRoleUpdateByEmailRequest(BaseModel):
-    email: EmailStr
+    email: LookupEmail
     role: Role
 
 
@@ -56,14 +83,14 @@ class MembershipOut(BaseModel):
 
 class WorkspaceMemberOut(BaseModel):
     name: str
-    email: EmailStr
+    email: StoredEmail
     role: Role
     joined_at: datetime
 
 
 class MeResponse(BaseModel):
     id: int
-    email: EmailStr
+    email: StoredEmail
     name: str
     workspaces: list[MembershipOut]
 
@@ -166,7 +193,8 @@ class InventoryDuplicateSuggestionResponse(BaseModel):
 
 
 class CopilotRequest(BaseModel):
-    query: str
+    # Copilot questions are a sentence or two; the bound keeps pasted dumps out of the guardrail scanners.
+    query: str = Field(max_length=2000)
 
 
 class InventoryPlannerMetric(str, enum.Enum):
@@ -216,6 +244,10 @@ class InventoryPlannerFilter(BaseModel):
     value: str | float | bool
 
 
+_ROWS_SORT_KEYS = frozenset({"name", "quantity", "vendor", "category", "status", "unit"})
+_GROUPED_SORT_KEYS = frozenset({"metric", "group"})
+
+
 class InventoryCopilotPlan(BaseModel):
     metric: InventoryPlannerMetric = InventoryPlannerMetric.rows
     group_by: InventoryPlannerGroupBy = InventoryPlannerGroupBy.none
@@ -229,27 +261,17 @@ class InventoryCopilotPlan(BaseModel):
         if self.limit < 1 or self.limit > 100:
             raise ValueError("limit must be between 1 and 100")
 
-        if self.metric == InventoryPlannerMetric.rows and self.group_by != InventoryPlannerGroupBy.none:
-            raise ValueError("rows metric requires group_by='none'")
-        if self.metric != InventoryPlannerMetric.rows and self.group_by == InventoryPlannerGroupBy.none:
-            allowed_scalar_metrics = {
-                InventoryPlannerMetric.count_items,
-                InventoryPlannerMetric.sum_quantity,
-                InventoryPlannerMetric.count_low_stock,
-                InventoryPlannerMetric.low_stock_ratio,
-            }
-            if self.metric not in allowed_scalar_metrics:
-                raise ValueError("invalid scalar metric for group_by='none'")
-
         if self.metric == InventoryPlannerMetric.rows:
-            allowed_sort = {"name", "quantity", "vendor", "category", "status", "unit"}
-            if self.sort_by not in allowed_sort:
+            if self.group_by != InventoryPlannerGroupBy.none:
+                raise ValueError("rows metric requires group_by='none'")
+            if self.sort_by not in _ROWS_SORT_KEYS:
                 raise ValueError("rows metric supports sort_by in name, quantity, vendor, category, status, unit")
         elif self.group_by == InventoryPlannerGroupBy.none:
+            # Every non-rows metric is a valid scalar metric, so only sort_by needs checking here.
             if self.sort_by != "metric":
                 raise ValueError("scalar metrics require sort_by='metric'")
         else:
-            if self.sort_by not in {"metric", "group"}:
+            if self.sort_by not in _GROUPED_SORT_KEYS:
                 raise ValueError("grouped metrics require sort_by='metric' or 'group'")
 
         return self
@@ -273,6 +295,12 @@ class EventBase(BaseModel):
 class EventCreate(EventBase):
     invitees: list[EmailStr] = []
 
+    @model_validator(mode="after")
+    def validate_time_range(self) -> "EventCreate":
+        if self.end_at <= self.start_at:
+            raise ValueError("end_at must be after start_at")
+        return self
+
 
 class EventUpdate(BaseModel):
     title: str | None = None
@@ -283,6 +311,13 @@ class EventUpdate(BaseModel):
     status: EventAttendance | None = None
     invitees: list[EmailStr] | None = None
 
+    @model_validator(mode="after")
+    def validate_time_range(self) -> "EventUpdate":
+        # Only a payload carrying both bounds can be checked here; update_event checks the merged event.
+        if self.start_at is not None and self.end_at is not None and self.end_at <= self.start_at:
+            raise ValueError("end_at must be after start_at")
+        return self
+
 
 class EventOut(BaseModel):
     id: int
@@ -310,7 +345,7 @@ class EventInviteRespondRequest(BaseModel):
 class EventInviteOut(BaseModel):
     id: int
     event_id: int
-    invited_user_email: EmailStr
+    invited_user_email: StoredEmail
     invited_user_id: int | None
     status: EventAttendance
 
@@ -340,6 +375,19 @@ class SuggestAlternativesRequest(BaseModel):
     start_at: datetime
     end_at: datetime
 
+    @model_validator(mode="after")
+    def validate_time_range(self) -> "SuggestAlternativesRequest":
+        # The Postgres overlap check builds tsrange(start_at, end_at), which rejects inverted bounds.
+        if self.end_at <= self.start_at:
+            raise ValueError("end_at must be after start_at")
+        return self
+
+
+class SuggestAlternativesResponse(BaseModel):
+    has_conflict: bool
+    conflicts: list[EventOut]
+    suggestions: list[AlternativeSuggestion]
+
 
 class EventDescriptionRequest(BaseModel):
     title: str
@@ -1,10 +1,18 @@
 from __future__ import annotations
 
 import json
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-from cryptography.fernet import Fernet, InvalidToken
+if TYPE_CHECKING:
+    from cryptography.fernet import Fernet
+
+# cryptography is imported inside the helpers: the vault is opt-in, so most processes never load it.
+
+# (path, master_key) -> ((st_mtime_ns, st_size), secrets) for read_secret, so repeat reads of an unchanged
+# vault file skip the read and the decrypt. Any rewrite of the file changes the stat signature.
+_vault_cache: dict[tuple[str, str], tuple[tuple[int, int], dict[str, str]]] = {}
 
 
 class SecretVaultError(RuntimeError):
@@ -12,10 +20,15 @@ class SecretVaultError(RuntimeError):
 
 
 def generate_master_key() -> str:
+    from cryptography.fernet import Fernet
+
     return Fernet.generate_key().decode("utf-8")
 
 
+@lru_cache(maxsize=4)
 def _fernet(master_key: str) -> Fernet:
+    from cryptography.fernet import Fernet
+
     key = master_key.strip().encode("utf-8")
     try:
         return Fernet(key)
@@ -32,6 +45,8 @@ def load_vault(path: str, master_key: str) -> dict[str, str]:
     if not token:
         return {}
 
+    from cryptography.fernet import InvalidToken
+
     fernet = _fernet(master_key)
     try:
         payload = fernet.decrypt(token)
@@ -39,7 +54,7 @@ def load_vault(path: str, master_key: str) -> dict[str, str]:
         raise SecretVaultError("Failed to decrypt vault. Check VAULT_MASTER_KEY.") from exc
 
     try:
-        raw = json.loads(payload.decode("utf-8"))
+        raw = json.loads(payload)
     except json.JSONDecodeError as exc:
         raise SecretVaultError("Vault payload is not valid JSON.") from exc
 
@@ -62,7 +77,24 @@ def save_vault(path: str, master_key: str, secrets: dict[str, str]) -> None:
     vault_path.write_bytes(token + b"\n")
 
 
-def read_secret(path: str, master_key: str, key: str) -> str | None:
+def _cached_vault(path: str, master_key: str) -> dict[str, str]:
+    try:
+        stat = Path(path).stat()
+    except FileNotFoundError:
+        return {}
+
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cache_key = (path, master_key)
+    cached = _vault_cache.get(cache_key)
+    if cached and cached[0] == signature:
+        return cached[1]
+
     secrets = load_vault(path=path, master_key=master_key)
+    _vault_cache[cache_key] = (signature, secrets)
+    return secrets
+
+
+def read_secret(path: str, master_key: str, key: str) -> str | None:
+    secrets = _cached_vault(path=path, master_key=master_key)
     value: Any = secrets.get(key)
     return value if isinstance(value, str) and value else None
@@ -7,17 +7,17 @@ try:
     from .app.config import get_settings
     from .app.deps import get_current_user, get_db
     from .app.database import init_db
-    from .app.models import User, Workspace, WorkspaceMember
+    from .app.models import User
     from .app.routers import auth, events, inventory, workspaces
-    from .app.schemas import MeResponse, MembershipOut
+    from .app.schemas import MeResponse
 except ImportError:
     # Vercel project-root import path (e.g., `from main import app`)
     from app.config import get_settings
     from app.deps import get_current_user, get_db
     from app.database import init_db
-    from app.models import User, Workspace, WorkspaceMember
+    from app.models import User
     from app.routers import auth, events, inventory, workspaces
-    from app.schemas import MeResponse, MembershipOut
+    from app.schemas import MeResponse
 
 app = FastAPI(title="AI Engineering Assessment API", version="1.0.0")
 settings = get_settings()
@@ -51,28 +51,11 @@ def health_api_prefix() -> dict:
     return {"status": "ok", "service": "api"}
 
 
-def _build_me_response(current_user: User, db: Session) -> MeResponse:
-    memberships = (
-        db.query(WorkspaceMember, Workspace)
-        .join(Workspace, Workspace.id == WorkspaceMember.workspace_id)
-        .filter(WorkspaceMember.user_id == current_user.id)
-        .all()
-    )
-    items = [
-        MembershipOut(workspace_id=membership.workspace_id, workspace_name=workspace.name, role=membership.role)
-        for membership, workspace in memberships
-    ]
-    return MeResponse(id=current_user.id, email=current_user.email, name=current_user.name, workspaces=items)
-
-
 @app.get("/me", response_model=MeResponse)
-def me_alias(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)) -> MeResponse:
-    return _build_me_response(current_user, db)
-
-
 @app.get("/api/me", response_model=MeResponse)
-def me_alias_api_prefix(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)) -> MeResponse:
-    return _build_me_response(current_user, db)
+def me_alias(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)) -> MeResponse:
+    # Same payload as /auth/me, including its column-only membership query.
+    return auth.me(current_user, db)
 
 
 for router in (auth.router, workspaces.router, inventory.router, events.router):
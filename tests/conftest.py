@@ -1,22 +1,56 @@
 from collections.abc import Generator
 
 import pytest
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
 
 from apps.api.app.database import Base
 from apps.api.app import models  # noqa: F401
+from apps.api.app.deps import invalidate_membership_cache
 
 
-@pytest.fixture()
-def db_session() -> Generator:
-    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
-    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    Base.metadata.create_all(bind=engine)
+@pytest.fixture(scope="session")
+def db_engine() -> Generator[Engine, None, None]:
+    # One in-memory database for the whole run; the schema is created once instead of per test.
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+
+    # pysqlite's own BEGIN handling breaks SAVEPOINTs; let SQLAlchemy open transactions itself. Foreign keys
+    # are switched on as in the app engine, so ON DELETE CASCADE behaves as it does in production.
+    @event.listens_for(engine, "connect")
+    def _configure_sqlite_connection(dbapi_connection, _connection_record) -> None:
+        dbapi_connection.isolation_level = None
+        dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+    @event.listens_for(engine, "begin")
+    def _emit_begin(connection) -> None:
+        connection.exec_driver_sql("BEGIN")
+
+    Base.metadata.create_all(bind=engine, checkfirst=False)
+    try:
+        yield engine
+    finally:
+        engine.dispose()
 
-    session = TestingSessionLocal()
+
+@pytest.fixture()
+def db_session(db_engine: Engine) -> Generator[Session, None, None]:
+    # Each test runs inside an outer transaction that is rolled back afterwards; commits made by the
+    # code under test only release savepoints, so nothing leaks into the next test.
+    connection = db_engine.connect()
+    transaction = connection.begin()
+    session = Session(
+        bind=connection,
+        autoflush=False,
+        expire_on_commit=False,
+        join_transaction_mode="create_savepoint",
+    )
     try:
         yield session
     finally:
+        # Rolled-back ids are handed out again, so cached roles must not outlive the test that created them.
+        invalidate_membership_cache()
         session.close()
-        Base.metadata.drop_all(bind=engine)
+        transaction.rollback()
+        connection.close()
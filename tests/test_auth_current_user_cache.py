@@ -0,0 +1,35 @@
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import event
+
+from apps.api.app.auth import create_access_token
+from apps.api.app.deps import get_current_user, invalidate_user_cache
+from apps.api.app.models import User
+
+
+def test_get_current_user_reuses_cached_user_for_same_token(db_session):
+    user = User(email="cache@example.com", name="Cache User", password_hash="x")
+    db_session.add(user)
+    db_session.commit()
+    invalidate_user_cache()
+
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=create_access_token(str(user.id)))
+    first = get_current_user(credentials, db_session)
+    db_session.expunge_all()
+
+    statements: list[str] = []
+    engine = db_session.get_bind()
+
+    def record(_conn, _cursor, statement, *_args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        second = get_current_user(credentials, db_session)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+        invalidate_user_cache()
+
+    assert statements == []
+    assert second.id == first.id
+    assert second.email == "cache@example.com"
+    assert second in db_session
@@ -0,0 +1,33 @@
+import pytest
+from fastapi import HTTPException
+
+from apps.api.app.auth import create_access_token, decode_access_token
+from apps.api.app.deps import invalidate_membership_cache, require_membership
+from apps.api.app.models import Role, User, Workspace, WorkspaceMember
+
+
+def test_access_token_round_trips_subject():
+    token = create_access_token("7")
+    assert decode_access_token(token) == "7"
+
+
+def test_require_membership_caches_database_lookup(db_session):
+    workspace = Workspace(name="Cached")
+    user = User(email="cached@example.com", name="Cached User", password_hash="x")
+    db_session.add_all([workspace, user])
+    db_session.flush()
+    membership = WorkspaceMember(workspace_id=workspace.id, user_id=user.id, role=Role.member)
+    db_session.add(membership)
+    db_session.commit()
+    invalidate_membership_cache()
+
+    assert require_membership(db_session, user, workspace.id).role == Role.member
+
+    db_session.delete(membership)
+    db_session.commit()
+    assert require_membership(db_session, user, workspace.id).role == Role.member
+
+    invalidate_membership_cache(user_id=user.id)
+    with pytest.raises(HTTPException) as exc_info:
+        require_membership(db_session, user, workspace.id)
+    assert exc_info.value.status_code == 403
@@ -0,0 +1,183 @@
+from datetime import datetime, timedelta
+
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import event as sa_event
+
+from apps.api.app.models import Event, EventInvite, Role, User, Workspace, WorkspaceMember
+from apps.api.app.routers.events import (
+    create_event,
+    delete_event,
+    list_event_invites,
+    list_events,
+    update_event,
+)
+from apps.api.app.schemas import EventCreate, EventOut, EventUpdate, SuggestAlternativesRequest
+
+
+def _event_invites(db_session, event_id: int) -> dict[str, int | None]:
+    invites = db_session.query(EventInvite).filter(EventInvite.event_id == event_id).all()
+    return {invite.invited_user_email: invite.invited_user_id for invite in invites}
+
+
+def test_create_and_update_event_resolve_invitee_users(db_session):
+    workspace = Workspace(name="Team")
+    owner = User(email="owner@example.com", name="Owner", password_hash="x")
+    known = User(email="known@example.com", name="Known", password_hash="x")
+    db_session.add_all([workspace, owner, known])
+    db_session.flush()
+    db_session.add(WorkspaceMember(workspace_id=workspace.id, user_id=owner.id, role=Role.member))
+    db_session.commit()
+
+    start_at = datetime(2030, 1, 1, 10, 0)
+    event = create_event(
+        EventCreate(
+            title="Planning",
+            start_at=start_at,
+            end_at=start_at + timedelta(hours=1),
+            invitees=["known@example.com", "guest@example.com"],
+        ),
+        workspace_id=workspace.id,
+        current_user=owner,
+        db=db_session,
+    )
+    assert _event_invites(db_session, event.id) == {"known@example.com": known.id, "guest@example.com": None}
+
+    update_event(
+        event.id,
+        EventUpdate(invitees=["known@example.com", "owner@example.com"]),
+        workspace_id=workspace.id,
+        current_user=owner,
+        db=db_session,
+    )
+    assert _event_invites(db_session, event.id) == {"known@example.com": known.id, "owner@example.com": owner.id}
+
+
+def test_list_events_returns_event_out_rows(db_session):
+    workspace = Workspace(name="Listing")
+    owner = User(email="lister@example.com", name="Lister", password_hash="x")
+    db_session.add_all([workspace, owner])
+    db_session.flush()
+    db_session.add(WorkspaceMember(workspace_id=workspace.id, user_id=owner.id, role=Role.member))
+    db_session.commit()
+
+    start_at = datetime(2030, 2, 1, 9, 0)
+    for offset, title in ((2, "Retro"), (0, "Standup")):
+        create_event(
+            EventCreate(
+                title=title,
+                start_at=start_at + timedelta(days=offset),
+                end_at=start_at + timedelta(days=offset, hours=1),
+                description=f"{title} notes",
+            ),
+            workspace_id=workspace.id,
+            current_user=owner,
+            db=db_session,
+        )
+
+    rows = list_events(
+        query=" ",
+        date_from=None,
+        date_to=None,
+        location=None,
+        workspace_id=workspace.id,
+        current_user=owner,
+        db=db_session,
+    )
+    events = [EventOut.model_validate(row) for row in rows]
+    assert [(event.title, event.description) for event in events] == [
+        ("Standup", "Standup notes"),
+        ("Retro", "Retro notes"),
+    ]
+
+    def titles_matching(query: str) -> list[str]:
+        rows = list_events(
+            query=query,
+            date_from=None,
+            date_to=None,
+            location=None,
+            workspace_id=workspace.id,
+            current_user=owner,
+            db=db_session,
+        )
+        return [row.title for row in rows]
+
+    assert titles_matching("STAND") == ["Standup"]
+    assert titles_matching("%") == []
+    assert titles_matching("_") == []
+
+
+def test_list_event_invites_query_count_is_independent_of_invite_count(db_session):
+    workspace = Workspace(name="Counting")
+    owner = User(email="counter@example.com", name="Counter", password_hash="x")
+    db_session.add_all([workspace, owner])
+    db_session.commit()
+    db_session.add(WorkspaceMember(workspace_id=workspace.id, user_id=owner.id, role=Role.member))
+    db_session.commit()
+
+    start_at = datetime(2030, 3, 1, 9, 0)
+    event = create_event(
+        EventCreate(
+            title="All hands",
+            start_at=start_at,
+            end_at=start_at + timedelta(hours=1),
+            invitees=[f"guest{index}@example.com" for index in range(5)],
+        ),
+        workspace_id=workspace.id,
+        current_user=owner,
+        db=db_session,
+    )
+
+    statements: list[str] = []
+
+    def count_statement(_conn, _cursor, statement, _parameters, _context, _executemany):
+        # The db_session fixture wraps each session transaction in a SAVEPOINT; only count queries.
+        if "SAVEPOINT" not in statement:
+            statements.append(statement)
+
+    engine = db_session.get_bind()
+    sa_event.listen(engine, "before_cursor_execute", count_statement)
+    try:
+        invites = list_event_invites(event.id, workspace_id=workspace.id, current_user=owner, db=db_session)
+    finally:
+        sa_event.remove(engine, "before_cursor_execute", count_statement)
+
+    assert len(invites) == 5
+    # One lookup for the event, one for its invites; create_event's check already cached the membership.
+    assert len(statements) == 2
+
+
+def test_delete_event_cascades_to_invites(db_session):
+    workspace = Workspace(name="Cleanup")
+    owner = User(email="cleaner@example.com", name="Cleaner", password_hash="x")
+    db_session.add_all([workspace, owner])
+    db_session.commit()
+    db_session.add(WorkspaceMember(workspace_id=workspace.id, user_id=owner.id, role=Role.member))
+    db_session.commit()
+
+    start_at = datetime(2030, 5, 1, 9, 0)
+    event = create_event(
+        EventCreate(
+            title="Offsite",
+            start_at=start_at,
+            end_at=start_at + timedelta(hours=2),
+            invitees=["a@example.com", "b@example.com"],
+        ),
+        workspace_id=workspace.id,
+        current_user=owner,
+        db=db_session,
+    )
+    assert len(_event_invites(db_session, event.id)) == 2
+
+    delete_event(event.id, workspace_id=workspace.id, current_user=owner, db=db_session)
+
+    # delete_event issues a single DELETE and relies on ON DELETE CASCADE for the invites.
+    assert db_session.query(Event).filter(Event.id == event.id).count() == 0
+    assert _event_invites(db_session, event.id) == {}
+
+
+@pytest.mark.parametrize("duration", [timedelta(0), timedelta(hours=-1)], ids=["zero_length", "inverted"])
+def test_suggest_alternatives_request_rejects_empty_or_inverted_window(duration):
+    start_at = datetime(2030, 4, 1, 9, 0)
+    with pytest.raises(ValidationError):
+        SuggestAlternativesRequest(start_at=start_at, end_at=start_at + duration)
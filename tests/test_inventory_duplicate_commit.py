@@ -1,5 +1,11 @@
-from apps.api.app.routers.inventory import _merge_into_existing_item
-from apps.api.app.models import InventoryItem, InventoryStatus
+from apps.api.app.routers.inventory import (
+    _find_duplicate_candidates,
+    _merge_into_existing_item,
+    _workspace_duplicate_index,
+    commit_import,
+)
+from apps.api.app.models import InventoryItem, InventoryStatus, Role, User, Workspace, WorkspaceMember
+from apps.api.app.schemas import ImportDuplicateAction, InventoryImportCommitRequest, InventoryImportItem
 
 
 def test_merge_into_existing_item_updates_quantity_and_status():
@@ -26,3 +32,137 @@ def test_merge_into_existing_item_updates_quantity_and_status():
 
     assert item.quantity == 12
     assert item.status == InventoryStatus.in_stock
+
+
+def _workspace_with_user(db_session, name: str) -> tuple[Workspace, User]:
+    workspace = Workspace(name=name)
+    user = User(email=f"{name.lower().replace(' ', '-')}@example.com", name=name, password_hash="x")
+    db_session.add_all([workspace, user])
+    db_session.commit()
+    return workspace, user
+
+
+def test_find_duplicate_candidates_ranks_exact_then_similar_names(db_session):
+    workspace, user = _workspace_with_user(db_session, "Duplicates")
+    for name, unit in (
+        ("USB-C Cable", "units"),
+        ("USB C Cable", "boxes"),
+        ("HDMI Cable", "units"),
+        ("Printer Paper", "reams"),
+    ):
+        db_session.add(
+            InventoryItem(
+                workspace_id=workspace.id,
+                name=name,
+                normalized_name=name.lower(),
+                unit=unit,
+                created_by=user.id,
+            )
+        )
+    db_session.commit()
+
+    candidates = _find_duplicate_candidates(db_session, workspace.id, "usb-c  cable", "units")
+
+    assert [(c.name, c.reason) for c in candidates] == [
+        ("USB-C Cable", "exact_name"),
+        ("USB C Cable", "similar_name_unit_mismatch"),
+    ]
+    assert candidates[0].similarity_score == 1.0
+    assert candidates[1].similarity_score == 0.909
+
+
+def test_workspace_duplicate_index_is_reused_until_items_change(db_session):
+    workspace, user = _workspace_with_user(db_session, "Index reuse")
+    db_session.add(InventoryItem(workspace_id=workspace.id, name="Toner", normalized_name="toner", created_by=user.id))
+    db_session.commit()
+
+    pool, _ = _workspace_duplicate_index(db_session, workspace.id)
+    assert _workspace_duplicate_index(db_session, workspace.id)[0] is pool
+
+    db_session.add(
+        InventoryItem(workspace_id=workspace.id, name="Staples", normalized_name="staples", created_by=user.id)
+    )
+    db_session.commit()
+    assert sorted(_workspace_duplicate_index(db_session, workspace.id)[1]) == ["staples", "toner"]
+
+    db_session.delete(db_session.query(InventoryItem).filter_by(normalized_name="toner").one())
+    db_session.commit()
+    assert _workspace_duplicate_index(db_session, workspace.id)[1] == ["staples"]
+
+
+def test_commit_import_resolves_merges_within_one_import(db_session):
+    workspace = Workspace(name="Imports")
+    user = User(email="importer@example.com", name="Importer", password_hash="x")
+    db_session.add_all([workspace, user])
+    db_session.commit()
+    db_session.add(WorkspaceMember(workspace_id=workspace.id, user_id=user.id, role=Role.member))
+    db_session.commit()
+
+    cable = InventoryItem(
+        workspace_id=workspace.id,
+        name="HDMI Cable",
+        normalized_name="hdmi cable",
+        quantity=1,
+        created_by=user.id,
+    )
+    db_session.add(cable)
+    db_session.commit()
+
+    items = commit_import(
+        InventoryImportCommitRequest(
+            items=[
+                InventoryImportItem(name="hdmi  cable", quantity=2),
+                InventoryImportItem(name="Toner", quantity=1),
+                InventoryImportItem(name="toner", quantity=3),
+                InventoryImportItem(name="HDMI Cable", quantity=5, duplicate_action=ImportDuplicateAction.create_new),
+                InventoryImportItem(
+                    name="Spare cable",
+                    quantity=4,
+                    duplicate_action=ImportDuplicateAction.merge,
+                    merge_item_id=cable.id,
+                ),
+            ]
+        ),
+        workspace_id=workspace.id,
+        current_user=user,
+        db=db_session,
+    )
+
+    by_id = {item.id: item for item in items}
+    assert by_id[cable.id].quantity == 7
+    assert sorted((item.normalized_name, item.quantity) for item in items) == [
+        ("hdmi cable", 5),
+        ("hdmi cable", 7),
+        ("toner", 4),
+    ]
+
+
+def test_commit_import_merges_into_closest_fuzzy_match(db_session):
+    workspace = Workspace(name="Fuzzy imports")
+    user = User(email="fuzzy@example.com", name="Fuzzy", password_hash="x")
+    db_session.add_all([workspace, user])
+    db_session.commit()
+    db_session.add(WorkspaceMember(workspace_id=workspace.id, user_id=user.id, role=Role.member))
+    db_session.commit()
+
+    paper = InventoryItem(
+        workspace_id=workspace.id,
+        name="Printer Paper",
+        normalized_name="printer paper",
+        quantity=2,
+        created_by=user.id,
+    )
+    db_session.add(paper)
+    db_session.commit()
+
+    items = commit_import(
+        InventoryImportCommitRequest(
+            items=[InventoryImportItem(name="Printer Papers", quantity=3, duplicate_action=ImportDuplicateAction.merge)]
+        ),
+        workspace_id=workspace.id,
+        current_user=user,
+        db=db_session,
+    )
+
+    assert items == [paper]
+    assert paper.quantity == 5
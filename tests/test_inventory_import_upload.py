@@ -0,0 +1,25 @@
+import asyncio
+from dataclasses import replace
+from io import BytesIO
+
+import pytest
+from fastapi import HTTPException, UploadFile
+
+from apps.api.app.routers import inventory
+
+
+def test_read_import_text_decodes_across_chunk_boundaries(monkeypatch):
+    monkeypatch.setattr(inventory, "UPLOAD_CHUNK_BYTES", 3)
+    upload = UploadFile(BytesIO("Café x2\nThé x1\n".encode("utf-8")), filename="receipt.txt")
+
+    assert asyncio.run(inventory._read_import_text("Header", upload)) == "Header\nCafé x2\nThé x1"
+
+
+def test_read_import_text_rejects_oversized_uploads(monkeypatch):
+    monkeypatch.setattr(inventory, "UPLOAD_CHUNK_BYTES", 4)
+    monkeypatch.setattr(inventory, "settings", replace(inventory.settings, import_max_upload_bytes=10))
+    upload = UploadFile(BytesIO(b"x" * 11), filename="receipt.txt")
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(inventory._read_import_text(None, upload))
+    assert exc_info.value.status_code == 413
@@ -1,6 +1,9 @@
 import pytest
+from apps.api.app.models import InventoryItem, Role, User, Workspace, WorkspaceMember
+from apps.api.app.routers import inventory
 from apps.api.app.routers.inventory import _normalize_category_label, _normalized_unit
 from apps.api.app.schemas import (
+    CopilotRequest,
     InventoryCopilotPlan,
     InventoryPlannerGroupBy,
     InventoryPlannerMetric,
@@ -26,3 +29,37 @@ def test_inventory_plan_rejects_rows_with_group_by():
 def test_inventory_plan_rejects_invalid_sort_for_rows():
     with pytest.raises(ValidationError):
         InventoryCopilotPlan(metric=InventoryPlannerMetric.rows, group_by=InventoryPlannerGroupBy.none, sort_by="metric")
+
+
+def test_copilot_group_sort_treats_blank_vendor_as_unknown(db_session, monkeypatch):
+    workspace = Workspace(name="Vendors")
+    user = User(email="vendors@example.com", name="Vendors", password_hash="x")
+    db_session.add_all([workspace, user])
+    db_session.commit()
+    db_session.add(WorkspaceMember(workspace_id=workspace.id, user_id=user.id, role=Role.member))
+    db_session.commit()
+    for name, vendor in (("Cable", "Beta"), ("Toner", "Acme"), ("Tape", None), ("Glue", "")):
+        db_session.add(
+            InventoryItem(
+                workspace_id=workspace.id,
+                name=name,
+                normalized_name=name.lower(),
+                vendor=vendor,
+                created_by=user.id,
+            )
+        )
+    db_session.commit()
+
+    def fake_copilot(*, execute_query_plan_tool, **_kwargs):
+        return execute_query_plan_tool(
+            {"metric": "count_items", "group_by": "vendor", "sort_by": "group", "sort_direction": "asc", "limit": 2}
+        )
+
+    monkeypatch.setattr(inventory.ai_service, "inventory_copilot", fake_copilot)
+
+    result = inventory.copilot(
+        CopilotRequest(query="items per vendor"), workspace_id=workspace.id, current_user=user, db=db_session
+    )
+
+    # Vendorless items group under "unknown", which sorts after "beta" instead of ahead of every vendor.
+    assert [row["vendor"] for row in result["rows"]] == ["acme", "beta"]
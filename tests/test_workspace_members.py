@@ -0,0 +1,83 @@
+import json
+
+import pytest
+from starlette.requests import Request
+
+from apps.api.app.models import Role, User, Workspace, WorkspaceMember
+from apps.api.app.routers.workspaces import _etag_matches, bulk_invite_members, list_members
+from apps.api.app.schemas import WorkspaceMemberBulkInviteRequest
+
+
+def test_bulk_invite_adds_new_members_and_reports_the_rest(db_session):
+    workspace = Workspace(name="Team")
+    admin = User(email="admin@example.com", name="Admin", password_hash="x")
+    member = User(email="member@example.com", name="Member", password_hash="x")
+    newcomer = User(email="new@example.com", name="Newcomer", password_hash="x")
+    db_session.add_all([workspace, admin, member, newcomer])
+    db_session.commit()
+    db_session.add_all(
+        [
+            WorkspaceMember(workspace_id=workspace.id, user_id=admin.id, role=Role.admin),
+            WorkspaceMember(workspace_id=workspace.id, user_id=member.id, role=Role.member),
+        ]
+    )
+    db_session.commit()
+
+    result = bulk_invite_members(
+        workspace.id,
+        WorkspaceMemberBulkInviteRequest(
+            emails=["new@EXAMPLE.com", "member@example.com", "ghost@example.com", "new@example.com"]
+        ),
+        current_user=admin,
+        db=db_session,
+    )
+
+    assert result["added"] == ["new@example.com"]
+    assert result["already_members"] == ["member@example.com"]
+    assert result["not_registered"] == ["ghost@example.com"]
+    assert {
+        user_id
+        for (user_id,) in db_session.query(WorkspaceMember.user_id).filter(WorkspaceMember.workspace_id == workspace.id)
+    } == {admin.id, member.id, newcomer.id}
+
+
+@pytest.mark.parametrize(
+    ("if_none_match", "expected"),
+    [
+        ('W/"3-2030"', True),
+        ('"3-2030"', True),
+        ('"1-2029", W/"3-2030"', True),
+        ("*", True),
+        ('W/"2-2030"', False),
+        (None, False),
+    ],
+)
+def test_member_list_etag_matching(if_none_match, expected):
+    assert _etag_matches(if_none_match, 'W/"3-2030"') is expected
+
+
+def _members_request(if_none_match: str | None = None) -> Request:
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+def test_list_members_etag_changes_when_a_member_is_renamed(db_session):
+    workspace = Workspace(name="Roster")
+    admin = User(email="roster@example.com", name="Roster Admin", password_hash="x")
+    db_session.add_all([workspace, admin])
+    db_session.commit()
+    db_session.add(WorkspaceMember(workspace_id=workspace.id, user_id=admin.id, role=Role.admin))
+    db_session.commit()
+
+    first = list_members(workspace.id, _members_request(), current_user=admin, db=db_session)
+    assert [member["email"] for member in json.loads(first.body)] == ["roster@example.com"]
+    etag = first.headers["etag"]
+
+    unchanged = list_members(workspace.id, _members_request(etag), current_user=admin, db=db_session)
+    assert unchanged.status_code == 304
+
+    admin.name = "Renamed Admin"
+    db_session.commit()
+    renamed = list_members(workspace.id, _members_request(etag), current_user=admin, db=db_session)
+    assert renamed.status_code == 200
+    assert json.loads(renamed.body)[0]["name"] == "Renamed Admin"